@@ -37,7 +37,7 @@ __email__ = ""
 __license__ = "MIT"
 
 from .dsl import DSLParser, DslToJsonConverter, JsonToDslConverter
-from .templates import TemplateManager, TEMPLATES
+from .templates import TemplateManager
 from .mcp.server import DEFAULT_COMFYUI_SERVER
 
 __all__ = [
@@ -47,4 +47,12 @@ __all__ = [
     "TemplateManager",
     "TEMPLATES",
     "DEFAULT_COMFYUI_SERVER",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    # TEMPLATES is built on first access (see comfy_mcp.templates)
+    if name == "TEMPLATES":
+        from .templates import TEMPLATES
+        return TEMPLATES
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -56,6 +56,16 @@ class Workflow(BaseModel):
     """Complete workflow containing sections."""
     sections: list[Section] = Field(default_factory=list)
 
+    @property
+    def node_count(self) -> int:
+        """Total number of nodes across all sections."""
+        return sum(len(section.nodes) for section in self.sections)
+
+    @property
+    def section_count(self) -> int:
+        """Number of sections."""
+        return len(self.sections)
+
     def __str__(self) -> str:
         result = "\n\n".join(str(s) for s in self.sections)
         # Add trailing newline if sections exist
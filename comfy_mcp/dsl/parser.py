@@ -1,5 +1,10 @@
 """Parser and AST transformer for ComfyUI Workflow DSL."""
 
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from hashlib import blake2b
 from pathlib import Path
 from lark import Lark, Transformer, Token, Tree
 from .ast_nodes import Connection, Property, Node, Section, Workflow
@@ -40,10 +45,11 @@ class WorkflowTransformer(Transformer):
 
     def node_type(self, items):
         """Transform node type: TYPE_NAME or TYPE_NAME.TYPE_NAME"""
+        # Node types repeat heavily; interning makes later dict lookups cheap
         if len(items) == 1:
-            return str(items[0])
+            return sys.intern(str(items[0]))
         else:
-            return f"{items[0]}.{items[1]}"
+            return sys.intern(f"{items[0]}.{items[1]}")
 
     def node(self, items):
         """Transform node: NAME : node_type property*"""
@@ -68,27 +74,67 @@ class WorkflowTransformer(Transformer):
         return Workflow(sections=sections)
 
 
+_DEFAULT_GRAMMAR_PATH = Path(__file__).parent / "grammar.lark"
+
+
+@lru_cache(maxsize=None)
+def _build_parser(grammar_path: Path) -> Lark:
+    """Compile the grammar once per path; Lark parsers are reusable."""
+    with open(grammar_path) as f:
+        return Lark(
+            f.read(),
+            start="workflow",
+            parser="earley",
+            ambiguity="resolve",
+        )
+
+
+_TRANSFORMER = WorkflowTransformer()
+
+
+# Keyed on a digest, not the text, so cached entries don't pin large DSL strings
+_PARSE_CACHE_SIZE = 128
+_parse_cache: "OrderedDict[tuple[Lark, bytes], Workflow]" = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+
+def _parse_cached(parser: Lark, dsl_text: str) -> Workflow:
+    """Parse and transform, memoized (LRU) on (parser, blake2b digest of the text)."""
+    key = (parser, blake2b(dsl_text.encode(), digest_size=16).digest())
+    with _parse_cache_lock:
+        workflow = _parse_cache.get(key)
+        if workflow is not None:
+            _parse_cache.move_to_end(key)
+            return workflow
+
+    workflow = _TRANSFORMER.transform(parser.parse(dsl_text))
+    with _parse_cache_lock:
+        _parse_cache[key] = workflow
+        if len(_parse_cache) > _PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return workflow
+
+
 class DSLParser:
     """Main DSL parser."""
 
     def __init__(self, grammar_path: str | Path | None = None):
         """Initialize parser with grammar."""
         if grammar_path is None:
-            grammar_path = Path(__file__).parent / "grammar.lark"
-
-        with open(grammar_path) as f:
-            self.parser = Lark(
-                f.read(),
-                start="workflow",
-                parser="earley",
-                ambiguity="resolve",
-            )
-        self.transformer = WorkflowTransformer()
-
-    def parse(self, dsl_text: str) -> Workflow:
-        """Parse DSL text into AST."""
-        tree = self.parser.parse(dsl_text)
-        return self.transformer.transform(tree)
+            grammar_path = _DEFAULT_GRAMMAR_PATH
+
+        self.parser = _build_parser(Path(grammar_path).resolve())
+        self.transformer = _TRANSFORMER
+
+    def parse(self, dsl_text: str | bytes) -> Workflow:
+        """Parse DSL text (str or UTF-8 bytes) into AST.
+
+        Repeated inputs are served from a cache; each call returns its own
+        deep copy so callers may mutate the result freely.
+        """
+        if isinstance(dsl_text, (bytes, bytearray)):
+            dsl_text = dsl_text.decode("utf-8")
+        return _parse_cached(self.parser, dsl_text).model_copy(deep=True)
 
     def parse_file(self, path: str | Path) -> Workflow:
         """Parse DSL file into AST."""
@@ -6,11 +6,18 @@ Agents work entirely in DSL format - JSON conversion is transparent.
 
 import sys
 import json
+import asyncio
 from pathlib import Path
 from collections import Counter
 from fastmcp import FastMCP, Context
 from fastmcp.exceptions import ToolError
 
+# orjson parses bytes directly and is much faster on large workflows
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 # Import version for CLI
 try:
     from comfy_mcp import __version__
@@ -51,6 +58,11 @@ def validate_path(filepath: str, base: Path = WORKFLOWS_BASE) -> Path:
         raise ToolError(f"Access denied: {filepath} is outside allowed directory")
 
 
+async def _read_file_bytes(path: Path) -> bytes:
+    """Read a file on a worker thread so the event loop is never blocked."""
+    return await asyncio.to_thread(path.read_bytes)
+
+
 # ===== FILE OPERATION TOOLS =====
 
 @mcp.tool
@@ -79,21 +91,22 @@ async def read_workflow(ctx: Context, filepath: str) -> str:
         if "examples" not in str(path):
             path = validate_path(filepath)
 
-        if not path.exists():
-            raise ToolError(f"File not found: {filepath}")
-
-        content = path.read_text()
+        # Let the read report a missing file instead of stat-ing it first
+        try:
+            content = await _read_file_bytes(path)
+        except FileNotFoundError:
+            raise ToolError(f"File not found: {filepath}") from None
 
         # If already DSL, return as-is
         if path.suffix == ".dsl":
             await ctx.info("File is already in DSL format")
-            return content
+            return content.decode()
 
         # If JSON, convert to DSL
         if path.suffix == ".json":
             await ctx.info("Converting JSON to DSL...")
 
-            workflow = json.loads(content)
+            workflow = _json_loads(content)
 
             # Handle full ComfyUI format
             if is_full_workflow_format(workflow):
@@ -255,16 +268,15 @@ def validate_workflow(dsl: str) -> dict:
         validate_workflow(dsl_content)
     """
     try:
-        parser = DSLParser()
-        workflow_ast = parser.parse(dsl)
+        workflow_ast = DSLParser().parse(dsl)
 
         # If parsing succeeded, it's valid
         return {
             "is_valid": True,
             "errors": [],
             "warnings": [],
-            "node_count": sum(len(section.nodes) for section in workflow_ast.sections),
-            "section_count": len(workflow_ast.sections)
+            "node_count": workflow_ast.node_count,
+            "section_count": workflow_ast.section_count
         }
 
     except Exception as e:
@@ -293,13 +305,14 @@ def get_workflow_info(dsl: str) -> dict:
         get_workflow_info(dsl_content)
     """
     try:
-        parser = DSLParser()
-        workflow_ast = parser.parse(dsl)
+        workflow_ast = DSLParser().parse(dsl)
 
         # Collect node information
-        node_types = []
+        node_type_counts = Counter()
+        node_count = 0
         sections = []
         connections = []
+        connections_append = connections.append
 
         for section in workflow_ast.sections:
             section_info = {
@@ -307,9 +320,10 @@ def get_workflow_info(dsl: str) -> dict:
                 "node_count": len(section.nodes),
                 "nodes": []
             }
+            node_count += len(section.nodes)
 
             for node in section.nodes:
-                node_types.append(node.node_type)
+                node_type_counts[node.node_type] += 1
                 section_info["nodes"].append({
                     "name": node.name,
                     "type": node.node_type,
@@ -319,7 +333,7 @@ def get_workflow_info(dsl: str) -> dict:
                 # Find connections
                 for prop in node.properties:
                     if isinstance(prop.value, Connection):
-                        connections.append({
+                        connections_append({
                             "from": prop.value.node,
                             "output": prop.value.output,
                             "to": node.name,
@@ -328,11 +342,8 @@ def get_workflow_info(dsl: str) -> dict:
 
             sections.append(section_info)
 
-        # Count unique node types
-        node_type_counts = dict(Counter(node_types))
-
         return {
-            "node_count": len(node_types),
+            "node_count": node_count,
             "section_count": len(sections),
             "connection_count": len(connections),
             "node_types": node_type_counts,
@@ -640,7 +651,7 @@ def get_template_dsl(template_name: str, source: str = "auto") -> dict:
                     "category": official_template.category,
                     "source": "official",
                     "source_url": official_template.source_url,
-                    "preview_images": official_template.preview_images or []
+                    "preview_images": list(official_template.preview_images)
                 }
         
         return {
@@ -865,7 +876,6 @@ save: SaveImage
 # ===== EXECUTION TOOLS =====
 
 import httpx
-import asyncio
 import websockets
 import uuid
 from typing import Optional, Dict, Any, List
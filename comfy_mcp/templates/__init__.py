@@ -1,6 +1,13 @@
 """Workflow templates for ComfyUI MCP server."""
 
 from .manager import TemplateManager
-from .templates import TEMPLATES
 
-__all__ = ["TemplateManager", "TEMPLATES"]
\ No newline at end of file
+__all__ = ["TemplateManager", "TEMPLATES"]
+
+
+def __getattr__(name: str):
+    # Resolve TEMPLATES lazily so importing the package doesn't build them
+    if name == "TEMPLATES":
+        from .templates import builtin_templates
+        return builtin_templates()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
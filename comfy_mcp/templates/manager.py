@@ -2,25 +2,77 @@
 
 import re
 import asyncio
-from typing import Dict, List, Optional, Any
-from .templates import TEMPLATES, WorkflowTemplate
+from functools import cached_property
+from typing import Callable, Dict, List, NamedTuple, Optional, Any
+from .templates import WorkflowTemplate, builtin_templates, render_dsl
 from .official import official_manager, OfficialTemplate
 
+# {parameter_name} placeholders in template DSL
+_PARAM_RE = re.compile(r'\{([^}]+)\}')
+
+
+class _ParamSpec(NamedTuple):
+    """Coercion and bounds for one well-known parameter name."""
+    coerce: Callable[[str], Any]
+    lo: float
+    hi: float
+    range_error: str
+    type_error: str
+    multiple_of: int = 0
+
+
+# Checks applied to template parameters with these names
+_PARAM_SPECS: Dict[str, _ParamSpec] = {
+    **{
+        name: _ParamSpec(int, 1, 2048, f"{name} must be between 1 and 2048",
+                         f"{name} must be a valid integer", multiple_of=64)
+        for name in ('width', 'height')
+    },
+    'steps': _ParamSpec(int, 1, 100, "steps must be between 1 and 100",
+                        "steps must be a valid integer"),
+    'cfg': _ParamSpec(float, 1.0, 20.0, "cfg must be between 1.0 and 20.0",
+                      "cfg must be a valid number"),
+    'seed': _ParamSpec(int, 0, float('inf'), "seed must be non-negative",
+                       "seed must be a valid integer"),
+    **{
+        name: _ParamSpec(float, 0.0, 1.0, f"{name} must be between 0.0 and 1.0",
+                         f"{name} must be a valid number")
+        for name in ('denoise', 'style_strength', 'control_strength')
+    },
+}
+
+
+def _check_param(name: str, value: Any, spec: _ParamSpec) -> List[str]:
+    """Coerce a value and range-check it against its spec."""
+    try:
+        val = spec.coerce(value)
+    except ValueError:
+        return [spec.type_error]
+    errors = []
+    if val < spec.lo or val > spec.hi:
+        errors.append(spec.range_error)
+    if spec.multiple_of and val % spec.multiple_of != 0:
+        errors.append(f"{name} should be divisible by {spec.multiple_of} for best results")
+    return errors
+
 
 class TemplateManager:
     """Manages workflow templates with parameter substitution."""
     
     def __init__(self):
-        self.custom_templates = TEMPLATES
         self.official_templates_synced = False
+        self._compiled_specs: Dict[str, Dict[str, _ParamSpec]] = {}
     
-    def list_templates(self, include_official: bool = True) -> List[Dict[str, Any]]:
-        """List all available templates with metadata."""
-        results = []
-        
-        # Add custom templates
-        for name, template in self.custom_templates.items():
-            results.append({
+    @cached_property
+    def custom_templates(self) -> Dict[str, WorkflowTemplate]:
+        """Built-in templates, loaded on first use."""
+        return builtin_templates()
+    
+    @cached_property
+    def _custom_entries(self) -> List[Dict[str, Any]]:
+        """Listing entries for custom templates, built once (they never change)."""
+        return [
+            {
                 "name": name,
                 "description": template.description,
                 "category": template.category,
@@ -29,7 +81,70 @@ class TemplateManager:
                 "required_models": template.required_models or [],
                 "parameters": template.parameters or {},
                 "source": "custom"
-            })
+            }
+            for name, template in self.custom_templates.items()
+        ]
+    
+    @staticmethod
+    def _copy_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a cached custom entry so callers can't mutate the cache or the templates."""
+        return {
+            **entry,
+            "tags": list(entry["tags"]),
+            "required_models": list(entry["required_models"]),
+            "parameters": dict(entry["parameters"])
+        }
+    
+    @cached_property
+    def _custom_search_keys(self) -> Dict[str, tuple]:
+        """Lowercased name, description, category and tags per custom template."""
+        return {
+            entry["name"]: (
+                entry["name"].lower(),
+                entry["description"].lower(),
+                entry["category"].lower(),
+                *(tag.lower() for tag in entry["tags"])
+            )
+            for entry in self._custom_entries
+        }
+    
+    @cached_property
+    def _custom_index(self) -> Dict[str, Dict[str, frozenset]]:
+        """Lowercased category/tag/difficulty -> names of custom templates."""
+        index: Dict[str, Dict[str, set]] = {"category": {}, "tag": {}, "difficulty": {}}
+        for name, template in self.custom_templates.items():
+            index["category"].setdefault(template.category.lower(), set()).add(name)
+            for tag in template.tags:
+                index["tag"].setdefault(tag.lower(), set()).add(name)
+            # Templates without a difficulty are never filtered out by it
+            index["difficulty"].setdefault((template.difficulty or "").lower(), set()).add(name)
+        return {
+            field: {key: frozenset(names) for key, names in keys.items()}
+            for field, keys in index.items()
+        }
+    
+    def _custom_candidates(
+        self,
+        category: Optional[str],
+        tags: Optional[List[str]],
+        difficulty: Optional[str]
+    ) -> Optional[frozenset]:
+        """Intersect index lookups for the given filters (None means unfiltered)."""
+        index = self._custom_index
+        candidates = None
+        if category:
+            candidates = index["category"].get(category.lower(), frozenset())
+        if tags:
+            tagged = frozenset().union(*(index["tag"].get(tag.lower(), ()) for tag in tags))
+            candidates = tagged if candidates is None else candidates & tagged
+        if difficulty:
+            rated = index["difficulty"].get(difficulty.lower(), frozenset()) | index["difficulty"].get("", frozenset())
+            candidates = rated if candidates is None else candidates & rated
+        return candidates
+    
+    def list_templates(self, include_official: bool = True) -> List[Dict[str, Any]]:
+        """List all available templates with metadata."""
+        results = [self._copy_entry(entry) for entry in self._custom_entries]
         
         # Add official templates if requested
         if include_official and official_manager.templates:
@@ -72,46 +187,27 @@ class TemplateManager:
         include_official: bool = True
     ) -> List[Dict[str, Any]]:
         """Search templates by various criteria."""
-        # Get all templates first
-        all_templates = self.list_templates(include_official=include_official)
         results = []
+        query_lower = query.lower() if query else None
         
-        for template_data in all_templates:
-            # Check source filter
-            if source and template_data.get("source") != source:
-                continue
-                
-            # Check query match (name, description, category)
-            if query:
-                query_lower = query.lower()
-                if not any([
-                    query_lower in template_data["name"].lower(),
-                    query_lower in template_data["description"].lower(),
-                    query_lower in template_data["category"].lower(),
-                ]):
-                    # For custom templates, also check tags
-                    if template_data.get("source") == "custom" and "tags" in template_data:
-                        if not any(query_lower in tag.lower() for tag in template_data["tags"]):
-                            continue
-                    else:
-                        continue
-            
-            # Check category
-            if category and template_data["category"].lower() != category.lower():
-                continue
-            
-            # Check tags (only for custom templates)
-            if tags and template_data.get("source") == "custom":
-                template_tags = template_data.get("tags", [])
-                if not any(tag.lower() in [t.lower() for t in template_tags] for tag in tags):
+        if not source or source == "custom":
+            candidates = self._custom_candidates(category, tags, difficulty)
+            search_keys = self._custom_search_keys
+            for template_data in self._custom_entries:
+                if candidates is not None and template_data["name"] not in candidates:
                     continue
-            
-            # Check difficulty (only for custom templates)
-            if difficulty and template_data.get("difficulty"):
-                if template_data["difficulty"].lower() != difficulty.lower():
+                
+                # Check query match (name, description, category, then tags)
+                if query_lower and not any(
+                    query_lower in key for key in search_keys[template_data["name"]]
+                ):
                     continue
-            
-            results.append(template_data)
+                
+                results.append(self._copy_entry(template_data))
+        
+        # Official templates have no tags or difficulty, so only query/category apply
+        if include_official and (not source or source == "official") and official_manager.templates:
+            results.extend(official_manager.search_templates(query=query, category=category))
         
         return results
     
@@ -151,6 +247,10 @@ class TemplateManager:
         if parameters:
             final_params.update(parameters)
         
+        # Built-in templates are pre-tokenized, so render them in a single pass
+        if builtin_templates().get(template_name) is template:
+            return render_dsl(template_name, final_params)
+        
         # Substitute parameters in DSL content if any
         if final_params:
             for param_name, param_value in final_params.items():
@@ -169,8 +269,11 @@ class TemplateManager:
         """Validate parameters for a template."""
         # Try to find template in custom or official
         template = None
+        specs: Dict[str, _ParamSpec] = {}
         if source in ["auto", "custom"]:
             template = self.custom_templates.get(template_name)
+            if template:
+                specs = self._param_specs(template_name, template)
         
         if not template and source in ["auto", "official"]:
             official_template = official_manager.get_template(template_name)
@@ -191,7 +294,6 @@ class TemplateManager:
         warnings = []
         
         # Check for required parameters (those in template but not provided)
-        template_params = template.parameters or {}
         required_params = set(self._extract_parameters_from_dsl(template.dsl_content))
         provided_params = set(parameters.keys())
         
@@ -206,11 +308,9 @@ class TemplateManager:
         
         # Validate specific parameter types/constraints
         for param_name, param_value in parameters.items():
-            if param_name in template_params:
-                validation_errors = self._validate_parameter_value(
-                    param_name, param_value, template_name
-                )
-                errors.extend(validation_errors)
+            spec = specs.get(param_name)
+            if spec is not None:
+                errors.extend(_check_param(param_name, param_value, spec))
         
         return {
             "valid": len(errors) == 0,
@@ -218,11 +318,21 @@ class TemplateManager:
             "warnings": warnings
         }
     
+    def _param_specs(self, template_name: str, template: WorkflowTemplate) -> Dict[str, _ParamSpec]:
+        """Specs for the template's checked parameters, compiled on first use."""
+        specs = self._compiled_specs.get(template_name)
+        if specs is None:
+            specs = self._compiled_specs[template_name] = {
+                name: _PARAM_SPECS[name]
+                for name in (template.parameters or {})
+                if name in _PARAM_SPECS
+            }
+        return specs
+    
     def _extract_parameters_from_dsl(self, dsl_content: str) -> List[str]:
         """Extract parameter placeholders from DSL content."""
-        # Find all {parameter_name} patterns
-        pattern = r'\{([^}]+)\}'
-        return list(set(re.findall(pattern, dsl_content)))
+        # Deduplicate while keeping first-seen order
+        return list(dict.fromkeys(_PARAM_RE.findall(dsl_content)))
     
     def _validate_parameter_value(
         self, 
@@ -231,52 +341,8 @@ class TemplateManager:
         template_name: str
     ) -> List[str]:
         """Validate a specific parameter value."""
-        errors = []
-        
-        # Common validations
-        if param_name in ['width', 'height']:
-            try:
-                val = int(param_value)
-                if val <= 0 or val > 2048:
-                    errors.append(f"{param_name} must be between 1 and 2048")
-                if val % 64 != 0:
-                    errors.append(f"{param_name} should be divisible by 64 for best results")
-            except ValueError:
-                errors.append(f"{param_name} must be a valid integer")
-        
-        elif param_name == 'steps':
-            try:
-                val = int(param_value)
-                if val < 1 or val > 100:
-                    errors.append("steps must be between 1 and 100")
-            except ValueError:
-                errors.append("steps must be a valid integer")
-        
-        elif param_name == 'cfg':
-            try:
-                val = float(param_value)
-                if val < 1.0 or val > 20.0:
-                    errors.append("cfg must be between 1.0 and 20.0")
-            except ValueError:
-                errors.append("cfg must be a valid number")
-        
-        elif param_name == 'seed':
-            try:
-                val = int(param_value)
-                if val < 0:
-                    errors.append("seed must be non-negative")
-            except ValueError:
-                errors.append("seed must be a valid integer")
-        
-        elif param_name in ['denoise', 'style_strength', 'control_strength']:
-            try:
-                val = float(param_value)
-                if val < 0.0 or val > 1.0:
-                    errors.append(f"{param_name} must be between 0.0 and 1.0")
-            except ValueError:
-                errors.append(f"{param_name} must be a valid number")
-        
-        return errors
+        spec = _PARAM_SPECS.get(param_name)
+        return _check_param(param_name, param_value, spec) if spec else []
     
     def get_template_info(self, template_name: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a template."""
@@ -1,17 +1,74 @@
 """Integration with official ComfyUI workflow templates."""
 
+import os
+import re
 import json
+import shutil
 import aiohttp
 import asyncio
+import bisect
 import time
-from typing import Dict, List, Optional, Any
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List, Optional, Any, Tuple, BinaryIO
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field, fields
 from ..dsl import JsonToDslConverter
 from .sync_config import get_sync_config
 
+# orjson reads/writes bytes directly and is much faster on large caches
+try:
+    import orjson
 
-@dataclass
+    _json_loads = orjson.loads
+
+    def _json_line(obj: Any) -> bytes:
+        # Stringify non-str keys (e.g. int node ids) as json.dumps does
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_line(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode() + b"\n"
+
+
+# Category keywords in priority order; first matching substring wins
+_CATEGORY_KEYWORDS = (
+    ("Text-to-Image", ("text-to-image", "text2img", "dalle", "ideogram")),
+    ("Image-to-Image", ("image-to-image", "img2img", "editing")),
+    ("Video Generation", ("video", "motion", "animation")),
+    ("Image Editing", ("inpainting", "inpaint")),
+    ("AI Chat", ("chat", "conversation", "ai")),
+    ("Audio", ("audio", "sound", "music")),
+    ("3D Generation", ("3d", "depth")),
+)
+_CATEGORY_PATTERNS = tuple(
+    (re.compile("|".join(map(re.escape, words))), category)
+    for category, words in _CATEGORY_KEYWORDS
+)
+
+# With pyahocorasick, every keyword is matched in a single scan of the name
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _build_category_automaton():
+    """Map every keyword to (priority, category) in one automaton."""
+    automaton = ahocorasick.Automaton()
+    for priority, (category, words) in enumerate(_CATEGORY_KEYWORDS):
+        for word in words:
+            # A keyword listed under several categories keeps its highest priority
+            if word not in automaton:
+                automaton.add_word(word, (priority, category))
+    automaton.make_automaton()
+    return automaton
+
+
+_CATEGORY_AUTOMATON = _build_category_automaton() if ahocorasick is not None else None
+
+
+@dataclass(frozen=True, slots=True)
 class OfficialTemplate:
     """Official ComfyUI template metadata."""
     
@@ -20,11 +77,168 @@ class OfficialTemplate:
     category: str
     workflow_json: Dict[str, Any]
     dsl_content: Optional[str] = None
-    preview_images: List[str] = None
+    preview_images: Tuple[str, ...] = ()
     source_url: str = ""
     last_updated: str = ""
+    # Lowercased once so searches don't re-lower every field per query
+    _desc_lower: str = field(default="", init=False, repr=False, compare=False)
+    _category_lower: str = field(default="", init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Cached JSON and callers may hand in lists (or null); store a tuple
+        object.__setattr__(self, "preview_images", tuple(self.preview_images or ()))
+        object.__setattr__(self, "_desc_lower", self.description.lower())
+        object.__setattr__(self, "_category_lower", self.category.lower())
     
 
+# Derived fields (init=False) are rebuilt on load, not written to the cache
+_TEMPLATE_FIELDS = tuple(f.name for f in fields(OfficialTemplate) if f.init)
+
+
+def _template_record(template: OfficialTemplate) -> Dict[str, Any]:
+    """Shallow field mapping; unlike asdict() it doesn't deep-copy workflow_json."""
+    return {name: getattr(template, name) for name in _TEMPLATE_FIELDS}
+
+
+def _decode_record_untyped(line: bytes) -> Tuple[str, OfficialTemplate]:
+    record = _json_loads(line)
+    return record["key"], OfficialTemplate(**record["template"])
+
+
+# msgspec decodes cache records straight into OfficialTemplate in one pass
+try:
+    import msgspec
+
+    class _CacheRecord(msgspec.Struct):
+        key: str
+        template: OfficialTemplate
+
+    _record_decoder = msgspec.json.Decoder(_CacheRecord)
+
+    def _decode_record(line: bytes) -> Tuple[str, OfficialTemplate]:
+        try:
+            record = _record_decoder.decode(line)
+        except msgspec.ValidationError:
+            # Hand-edited or older records (e.g. null preview_images)
+            return _decode_record_untyped(line)
+        return record.key, record.template
+except ImportError:
+    _decode_record = _decode_record_untyped
+
+
+def read_cache_stream(f: BinaryIO) -> Tuple[Dict[str, Any], Dict[str, OfficialTemplate]]:
+    """Read a template cache into (metadata, templates).
+    
+    Caches are NDJSON: a header line followed by one record per template.
+    Older single-document JSON caches are still accepted.
+    """
+    first_line = f.readline()
+    try:
+        header = _json_loads(first_line)
+    except ValueError:
+        header = None
+    
+    if not isinstance(header, dict) or header.get("format") != "ndjson":
+        # Legacy layout: {"metadata": ..., "templates": {...}} or a bare mapping
+        cache_data = header if header is not None else _json_loads(first_line + f.read())
+        templates = cache_data.get("templates", cache_data)
+        return cache_data.get("metadata", {}), {
+            name: OfficialTemplate(**data)
+            for name, data in templates.items() if name != "metadata"
+        }
+    
+    templates = {}
+    for line in f:
+        if line.strip():
+            name, template = _decode_record(line)
+            templates[name] = template
+    return header.get("metadata", {}), templates
+
+
+# Preview image extensions in the order their images are listed
+_PREVIEW_EXTENSIONS = {".webp": 0, ".png": 1, ".jpg": 2, ".jpeg": 3}
+
+
+class _PreviewIndex:
+    """Preview image URLs looked up by template-name prefix."""
+    
+    def __init__(self, previews: List[Tuple[str, int, int, str]]):
+        # (name, extension rank, listing position, download_url), sorted by name
+        self._previews = sorted(previews)
+        self._names = [preview[0] for preview in self._previews]
+    
+    def lookup(self, template_name: str) -> List[str]:
+        """URLs of images whose name starts with template_name, by extension then listing order."""
+        matches = []
+        for i in range(bisect.bisect_left(self._names, template_name), len(self._names)):
+            if not self._names[i].startswith(template_name):
+                break
+            matches.append(self._previews[i])
+        matches.sort(key=lambda preview: preview[1:3])
+        return [preview[3] for preview in matches]
+
+
+class RateLimitedError(Exception):
+    """GitHub refused a request with 403/429; retry_after is its hint in seconds."""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _retry_after_seconds(headers) -> Optional[float]:
+    """Parse a numeric Retry-After header (HTTP-date values are ignored)."""
+    value = headers.get("Retry-After") if headers is not None else None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class _TemplateDict(dict):
+    """Template mapping that tells its manager when it is edited in place."""
+    
+    def __init__(self, templates: Dict[str, OfficialTemplate], on_change: Callable[[], None]):
+        super().__init__(templates)
+        self._on_change = on_change
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._on_change()
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._on_change()
+    
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self._on_change()
+        return result
+    
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._on_change()
+        return value
+    
+    def popitem(self):
+        item = super().popitem()
+        self._on_change()
+        return item
+    
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._on_change()
+        return value
+    
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._on_change()
+    
+    def clear(self):
+        super().clear()
+        self._on_change()
+
+
 class OfficialTemplateManager:
     """Manages official ComfyUI workflow templates."""
     
@@ -34,7 +248,9 @@ class OfficialTemplateManager:
     
     def __init__(self):
         self.converter = JsonToDslConverter()
-        self.templates: Dict[str, OfficialTemplate] = {}
+        self._category_index: Optional[Dict[str, frozenset]] = None
+        self._list_cache: Optional[List[Dict[str, Any]]] = None
+        self.templates = {}
         self.config = get_sync_config()
         self.cache_dir = self.config.cache_dir
         self.cache_dir.mkdir(exist_ok=True)
@@ -46,26 +262,62 @@ class OfficialTemplateManager:
             "skipped": 0,
             "conversion_failures": 0
         }
+    
+    @property
+    def templates(self) -> Dict[str, OfficialTemplate]:
+        """Loaded templates by name; edits (in place or wholesale) reset the indexes."""
+        return self._templates
+    
+    @templates.setter
+    def templates(self, templates: Dict[str, OfficialTemplate]):
+        self._templates = _TemplateDict(templates, self._invalidate_indexes)
+        self._invalidate_indexes()
+        self._refresh_indexes()
         
-    async def fetch_template_list(self) -> List[Dict[str, Any]]:
+    def _new_session(self) -> aiohttp.ClientSession:
+        """Keep-alive GitHub session; use as ``async with`` so it is always closed."""
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=64, keepalive_timeout=30),
+            timeout=aiohttp.ClientTimeout(total=self.config.request_timeout),
+            headers={"Accept": "application/vnd.github+json"}
+        )
+    
+    @asynccontextmanager
+    async def _session_scope(self, session: Optional[aiohttp.ClientSession]):
+        """Use the caller's session, or open a short-lived one."""
+        if session is not None:
+            yield session
+        else:
+            async with self._new_session() as owned:
+                yield owned
+    
+    async def fetch_template_list(
+        self, session: Optional[aiohttp.ClientSession] = None
+    ) -> List[Dict[str, Any]]:
         """Fetch list of available templates from GitHub API."""
         url = f"{self.GITHUB_API_BASE}/{self.TEMPLATES_PATH}"
         
-        async with aiohttp.ClientSession() as session:
+        async with self._session_scope(session) as session:
             async with session.get(url) as response:
                 if response.status == 200:
                     return await response.json()
                 else:
                     raise Exception(f"Failed to fetch templates: {response.status}")
     
-    
-    async def download_workflow_json(self, download_url: str) -> Dict[str, Any]:
+    async def download_workflow_json(
+        self, download_url: str, session: Optional[aiohttp.ClientSession] = None
+    ) -> Dict[str, Any]:
         """Download and parse workflow JSON file."""
-        async with aiohttp.ClientSession() as session:
+        async with self._session_scope(session) as session:
             async with session.get(download_url) as response:
                 if response.status == 200:
-                    content = await response.text()
-                    return json.loads(content)
+                    # Parse the raw body; orjson takes bytes without a decode step
+                    return _json_loads(await response.read())
+                elif response.status in (403, 429):
+                    raise RateLimitedError(
+                        f"Failed to download workflow: {response.status}",
+                        _retry_after_seconds(response.headers)
+                    )
                 else:
                     raise Exception(f"Failed to download workflow: {response.status}")
     
@@ -86,42 +338,15 @@ class OfficialTemplateManager:
         }
         
         try:
-            # Fetch template list (files in /templates directory)
-            template_list = await self.fetch_template_list()
-            
-            # Filter for .json files only and apply configuration filters
-            json_files = []
-            for item in template_list:
-                if item["type"] == "file" and item["name"].endswith(".json"):
-                    file_size = item.get("size", 0)
-                    if self.config.should_sync_template(item["name"], file_size):
-                        json_files.append(item)
-                    else:
-                        self.sync_stats["skipped"] += 1
-                        print(f"⏭️  Skipped {item['name']} (filtered by config)")
-            
-            print(f"📊 Found {len(json_files)} templates to sync ({self.sync_stats['skipped']} skipped by filters)")
-            
-            # Process templates with concurrency control
-            semaphore = asyncio.Semaphore(self.config.max_concurrent_downloads)
-            tasks = [self._process_template(semaphore, json_file, template_list) for json_file in json_files]
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Collect successful templates
-            synced_templates = {}
-            for result in results:
-                if isinstance(result, Exception):
-                    self.sync_stats["failed"] += 1
-                    print(f"❌ Template processing failed: {result}")
-                elif result is not None:
-                    template_name, template = result
-                    synced_templates[template_name] = template
-                    self.sync_stats["successful"] += 1
+            # One connection pool for the listing and every download, closed with the sync
+            async with self._new_session() as session:
+                synced_templates = await self._sync_with_session(session)
             
             # Cache results
             await self._cache_templates(synced_templates)
             
+            # New template set: drop the listing; the setter rebuilds the indexes
+            self._list_cache = None
             self.templates = synced_templates
             self.last_sync_time = sync_start_time
             
@@ -142,122 +367,230 @@ class OfficialTemplateManager:
                 print(f"📁 Loaded {len(cached_templates)} templates from cache")
             return cached_templates
     
-    async def _process_template(self, semaphore: asyncio.Semaphore, json_file: dict, template_list: list) -> Optional[tuple]:
-        """Process a single template with concurrency control."""
-        async with semaphore:
-            template_name = json_file["name"].replace(".json", "")
-            self.sync_stats["total_attempted"] += 1
+    async def _sync_with_session(self, session: aiohttp.ClientSession) -> Dict[str, OfficialTemplate]:
+        """List, download and convert templates over a shared session."""
+        # Fetch template list (files in /templates directory)
+        template_list = await self.fetch_template_list(session=session)
+        
+        # One pass: filter .json files through the config and index preview images
+        json_files = []
+        previews = []
+        for position, item in enumerate(template_list):
+            name = item["name"]
+            ext = name[name.rfind("."):]
+            if ext == ".json":
+                if item["type"] != "file":
+                    continue
+                if self.config.should_sync_template(name, item.get("size", 0)):
+                    json_files.append(item)
+                else:
+                    self.sync_stats["skipped"] += 1
+                    print(f"⏭️  Skipped {name} (filtered by config)")
+            elif ext in _PREVIEW_EXTENSIONS:
+                previews.append((name, _PREVIEW_EXTENSIONS[ext], position, item["download_url"]))
+        
+        print(f"📊 Found {len(json_files)} templates to sync ({self.sync_stats['skipped']} skipped by filters)")
+        
+        # Download batch N+1 while batch N is converted to DSL
+        results = await self._run_sync_pipeline(json_files, _PreviewIndex(previews), session)
+        
+        # Collect successful templates
+        synced_templates = {}
+        for result in results:
+            if isinstance(result, Exception):
+                self.sync_stats["failed"] += 1
+                print(f"❌ Template processing failed: {result}")
+            elif result is not None:
+                template_name, template = result
+                synced_templates[template_name] = template
+                self.sync_stats["successful"] += 1
+        
+        return synced_templates
+    
+    async def _run_sync_pipeline(
+        self, json_files: list, previews: _PreviewIndex,
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> list:
+        """Double-buffer downloads against DSL conversion.
+        
+        A producer downloads templates in batches of ``max_concurrent_downloads``
+        and hands them over through a two-slot queue, while the consumer converts
+        the previous batch on a worker thread.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+        producer = asyncio.create_task(self._download_batches(json_files, queue, session))
+        
+        results = []
+        try:
+            while (batch := await queue.get()) is not None:
+                results.extend(
+                    await asyncio.to_thread(self._build_batch, batch, previews)
+                )
+        except BaseException:
+            producer.cancel()
+            raise
+        
+        await producer
+        return results
+    
+    async def _download_batches(
+        self, json_files: list, queue: asyncio.Queue,
+        session: Optional[aiohttp.ClientSession] = None
+    ):
+        """Download templates batch by batch and push them onto the queue."""
+        batch_size = max(1, self.config.max_concurrent_downloads)
+        try:
+            for start in range(0, len(json_files), batch_size):
+                batch = json_files[start:start + batch_size]
+                downloads = await asyncio.gather(
+                    *(self._download_template(json_file, session) for json_file in batch),
+                    return_exceptions=True
+                )
+                await queue.put(list(zip(batch, downloads, strict=True)))
+        except Exception:
+            # Unblock the consumer; the error surfaces when the producer is awaited
+            await queue.put(None)
+            raise
+        await queue.put(None)
+    
+    async def _download_template(
+        self, json_file: dict, session: Optional[aiohttp.ClientSession] = None
+    ) -> Dict[str, Any]:
+        """Download a single template's workflow JSON with retry logic."""
+        template_name = json_file["name"].replace(".json", "")
+        self.sync_stats["total_attempted"] += 1
+        print(f"📥 Processing template: {template_name}")
+        
+        for attempt in range(self.config.max_retries):
+            try:
+                return await self.download_workflow_json(json_file["download_url"], session=session)
+            except Exception as e:
+                if attempt == self.config.max_retries - 1:
+                    print(f"❌ Failed to process {template_name}: {e}")
+                    raise e
+                print(f"⚠️  Retry {attempt + 1}/{self.config.max_retries} for {template_name}: {e}")
+                if isinstance(e, RateLimitedError):
+                    # Honour GitHub's hint up to a cap, otherwise back off exponentially
+                    max_delay = self.config.retry_delay * (2 ** self.config.max_retries)
+                    delay = e.retry_after
+                    if delay is None or delay > max_delay:
+                        delay = self.config.retry_delay * (2 ** attempt)
+                else:
+                    delay = self.config.retry_delay * (attempt + 1)
+                await asyncio.sleep(delay)
+    
+    def _build_batch(self, batch: list, previews: _PreviewIndex) -> list:
+        """Convert a downloaded batch to templates (runs in a worker thread)."""
+        results = []
+        for json_file, workflow_json in batch:
+            if isinstance(workflow_json, Exception):
+                results.append(workflow_json)
+                continue
+            try:
+                results.append(self._build_template(json_file, workflow_json, previews))
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    def _build_template(self, json_file: dict, workflow_json: Dict[str, Any], previews: _PreviewIndex) -> Optional[tuple]:
+        """Convert a downloaded workflow to DSL and wrap it in an OfficialTemplate."""
+        template_name = json_file["name"].replace(".json", "")
+        
+        try:
+            # Look for corresponding preview images
+            preview_images = previews.lookup(template_name)
             
+            # Convert to DSL
+            dsl_content = None
             try:
-                print(f"📥 Processing template: {template_name}")
-                
-                # Download workflow with retry logic
-                workflow_json = None
-                for attempt in range(self.config.max_retries):
-                    try:
-                        workflow_json = await self.download_workflow_json(json_file["download_url"])
-                        break
-                    except Exception as e:
-                        if attempt == self.config.max_retries - 1:
-                            raise e
-                        print(f"⚠️  Retry {attempt + 1}/{self.config.max_retries} for {template_name}: {e}")
-                        await asyncio.sleep(self.config.retry_delay * (attempt + 1))
-                
-                # Look for corresponding preview images
-                preview_images = []
-                image_extensions = ['.webp', '.png', '.jpg', '.jpeg']
-                for ext in image_extensions:
-                    image_files = [f for f in template_list if f["name"].startswith(template_name) and f["name"].endswith(ext)]
-                    preview_images.extend([f["download_url"] for f in image_files])
-                
-                # Convert to DSL
-                dsl_content = None
-                try:
-                    # Import conversion helpers
-                    from ..dsl import is_full_workflow_format, full_workflow_to_simplified
-                    
-                    # Check if it's in full workflow format and convert if needed
-                    if is_full_workflow_format(workflow_json):
-                        workflow_json = full_workflow_to_simplified(workflow_json)
-                    
-                    workflow_ast = self.converter.convert(workflow_json)
-                    dsl_content = str(workflow_ast)
-                except Exception as e:
-                    self.sync_stats["conversion_failures"] += 1
-                    print(f"⚠️  Failed to convert {template_name} to DSL: {e}")
-                    if not self.config.skip_conversion_errors:
-                        raise e
-                    if not self.config.save_failed_conversions:
-                        return None
+                # Import conversion helpers
+                from ..dsl import is_full_workflow_format, full_workflow_to_simplified
                 
-                # Create template object
-                template = OfficialTemplate(
-                    name=template_name.replace("_", " ").title(),
-                    description=f"Official ComfyUI template: {template_name}",
-                    category=self._infer_category(template_name),
-                    workflow_json=workflow_json,
-                    dsl_content=dsl_content,
-                    preview_images=preview_images,
-                    source_url=f"https://github.com/Comfy-Org/workflow_templates/blob/main/templates/{json_file['name']}",
-                    last_updated=json_file.get("updated_at", "")
-                )
-                
-                print(f"✅ Successfully processed {template_name}")
-                return template_name, template
+                # Check if it's in full workflow format and convert if needed
+                if is_full_workflow_format(workflow_json):
+                    workflow_json = full_workflow_to_simplified(workflow_json)
                 
+                workflow_ast = self.converter.convert(workflow_json)
+                dsl_content = str(workflow_ast)
             except Exception as e:
-                print(f"❌ Failed to process {template_name}: {e}")
-                raise e
+                self.sync_stats["conversion_failures"] += 1
+                print(f"⚠️  Failed to convert {template_name} to DSL: {e}")
+                if not self.config.skip_conversion_errors:
+                    raise e
+                if not self.config.save_failed_conversions:
+                    return None
+            
+            # Create template object
+            template = OfficialTemplate(
+                name=template_name.replace("_", " ").title(),
+                description=f"Official ComfyUI template: {template_name}",
+                category=self._infer_category(template_name),
+                workflow_json=workflow_json,
+                dsl_content=dsl_content,
+                preview_images=preview_images,
+                source_url=f"https://github.com/Comfy-Org/workflow_templates/blob/main/templates/{json_file['name']}",
+                last_updated=json_file.get("updated_at", "")
+            )
+            
+            print(f"✅ Successfully processed {template_name}")
+            return template_name, template
+            
+        except Exception as e:
+            print(f"❌ Failed to process {template_name}: {e}")
+            raise e
     
     def _infer_category(self, template_name: str) -> str:
         """Infer template category from name."""
         name_lower = template_name.lower()
         
-        if any(word in name_lower for word in ['text-to-image', 'text2img', 'dalle', 'ideogram']):
-            return "Text-to-Image"
-        elif any(word in name_lower for word in ['image-to-image', 'img2img', 'editing']):
-            return "Image-to-Image"
-        elif any(word in name_lower for word in ['video', 'motion', 'animation']):
-            return "Video Generation"
-        elif any(word in name_lower for word in ['inpainting', 'inpaint']):
-            return "Image Editing"
-        elif any(word in name_lower for word in ['chat', 'conversation', 'ai']):
-            return "AI Chat"
-        elif any(word in name_lower for word in ['audio', 'sound', 'music']):
-            return "Audio"
-        elif any(word in name_lower for word in ['3d', 'depth']):
-            return "3D Generation"
-        else:
-            return "Miscellaneous"
+        if _CATEGORY_AUTOMATON is not None:
+            # Matches come in text order, so keep the highest-priority category seen
+            best = min(
+                (match for _, match in _CATEGORY_AUTOMATON.iter(name_lower)),
+                default=None
+            )
+            return best[1] if best else "Miscellaneous"
+        
+        for pattern, category in _CATEGORY_PATTERNS:
+            if pattern.search(name_lower):
+                return category
+        return "Miscellaneous"
     
     async def _cache_templates(self, templates: Dict[str, OfficialTemplate]):
         """Cache templates to local storage."""
         cache_file = self.cache_dir / "official_templates.json"
         
-        # Backup existing cache if configured
-        if self.config.backup_cache and cache_file.exists():
-            backup_file = self.cache_dir / f"official_templates_backup_{int(time.time())}.json"
-            cache_file.rename(backup_file)
-            print(f"📁 Backed up previous cache to {backup_file.name}")
-        
-        # Convert to serializable format with metadata
-        cache_data = {
+        header = {
+            "format": "ndjson",
             "metadata": {
                 "last_sync": time.time(),
                 "sync_stats": self.sync_stats,
                 "template_count": len(templates),
                 "config_hash": hash(str(asdict(self.config))),
-                "version": "1.0"
-            },
-            "templates": {
-                name: asdict(template) 
-                for name, template in templates.items()
+                "version": "2.0"
             }
         }
         
-        with open(cache_file, 'w') as f:
-            json.dump(cache_data, f, indent=2)
+        # Stream one record per line, then swap the file in atomically
+        tmp_file = cache_file.with_name(cache_file.name + ".tmp")
+        try:
+            with open(tmp_file, "wb") as f:
+                f.write(_json_line(header))
+                for name, template in templates.items():
+                    f.write(_json_line({"key": name, "template": _template_record(template)}))
+            
+            # Backup existing cache if configured; copied so the live file stays until the swap
+            if self.config.backup_cache and cache_file.exists():
+                backup_file = self.cache_dir / f"official_templates_backup_{int(time.time())}.json"
+                shutil.copy2(cache_file, backup_file)
+                print(f"📁 Backed up previous cache to {backup_file.name}")
+            
+            os.replace(tmp_file, cache_file)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
         
+        self._list_cache = None
         print(f"💾 Cached {len(templates)} templates to {cache_file}")
     
     def get_sync_stats(self) -> dict:
@@ -277,11 +610,10 @@ class OfficialTemplateManager:
             return {}
         
         try:
-            with open(cache_file, 'r') as f:
-                cache_data = json.load(f)
+            with open(cache_file, "rb") as f:
+                metadata, templates = read_cache_stream(f)
             
             # Check cache metadata if available
-            metadata = cache_data.get("metadata", {})
             if metadata:
                 cache_age_hours = (time.time() - metadata.get("last_sync", 0)) / 3600
                 print(f"📁 Cache age: {cache_age_hours:.1f} hours")
@@ -290,12 +622,6 @@ class OfficialTemplateManager:
                 if cache_age_hours > self.config.cache_ttl_hours:
                     print(f"⚠️  Cache is older than {self.config.cache_ttl_hours} hours, consider re-syncing")
             
-            templates = {}
-            template_data_dict = cache_data.get("templates", cache_data)  # Backward compatibility
-            for name, template_data in template_data_dict.items():
-                if name != "metadata":  # Skip metadata key
-                    templates[name] = OfficialTemplate(**template_data)
-            
             print(f"📁 Loaded {len(templates)} templates from cache")
             return templates
             
@@ -303,24 +629,48 @@ class OfficialTemplateManager:
             print(f"⚠️  Failed to load cached templates: {e}")
             return {}
     
+    def _invalidate_indexes(self):
+        """Drop the category index and listing; rebuilt on next use."""
+        self._category_index = None
+        self._list_cache = None
+    
+    def _refresh_indexes(self):
+        """Rebuild the category index if self.templates was edited."""
+        if self._category_index is None:
+            index: Dict[str, set] = {}
+            for name, template in self._templates.items():
+                index.setdefault(template._category_lower, set()).add(name)
+            self._category_index = {cat: frozenset(names) for cat, names in index.items()}
+    
     def get_template(self, name: str) -> Optional[OfficialTemplate]:
         """Get a specific official template."""
         return self.templates.get(name)
     
+    @staticmethod
+    def _template_entry(name: str, template: OfficialTemplate) -> Dict[str, Any]:
+        """Listing metadata for one template."""
+        return {
+            "name": name,
+            "display_name": template.name,
+            "description": template.description,
+            "category": template.category,
+            "source": "official",
+            "preview_images": list(template.preview_images),
+            "source_url": template.source_url,
+            "has_dsl": template.dsl_content is not None
+        }
+    
     def list_templates(self) -> List[Dict[str, Any]]:
         """List all official templates with metadata."""
+        if self._list_cache is None:
+            self._list_cache = [
+                self._template_entry(name, template)
+                for name, template in self._templates.items()
+            ]
+        # Copies, so callers can't corrupt the cached listing
         return [
-            {
-                "name": name,
-                "display_name": template.name,
-                "description": template.description,
-                "category": template.category,
-                "source": "official",
-                "preview_images": template.preview_images or [],
-                "source_url": template.source_url,
-                "has_dsl": template.dsl_content is not None
-            }
-            for name, template in self.templates.items()
+            {**entry, "preview_images": list(entry["preview_images"])}
+            for entry in self._list_cache
         ]
     
     def search_templates(
@@ -329,24 +679,23 @@ class OfficialTemplateManager:
         category: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Search official templates."""
-        results = self.list_templates()
+        self._refresh_indexes()
+        candidates = self.templates.items()
+        
+        if category:
+            names = self._category_index.get(category.lower(), frozenset())
+            candidates = [(name, t) for name, t in candidates if name in names]
         
         if query:
             query_lower = query.lower()
-            results = [
-                t for t in results 
-                if query_lower in t["name"].lower() 
-                or query_lower in t["description"].lower()
-                or query_lower in t["category"].lower()
+            candidates = [
+                (name, t) for name, t in candidates
+                if query_lower in name.lower()
+                or query_lower in t._desc_lower
+                or query_lower in t._category_lower
             ]
         
-        if category:
-            results = [
-                t for t in results 
-                if t["category"].lower() == category.lower()
-            ]
-        
-        return results
+        return [self._template_entry(name, t) for name, t in candidates]
 
 
 # Global instance
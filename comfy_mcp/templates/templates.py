@@ -1,6 +1,11 @@
 """Workflow template definitions."""
 
-from typing import Dict, List, Optional
+import itertools
+import string
+import sys
+import types
+from functools import cache, lru_cache
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
 
@@ -18,25 +23,9 @@ class WorkflowTemplate:
     difficulty: str = "beginner"  # beginner, intermediate, advanced
 
 
-# Template definitions
-TEMPLATES = {
-    "text2img_basic": WorkflowTemplate(
-        name="Basic Text-to-Image",
-        description="Simple text-to-image generation with basic prompting",
-        category="Generation",
-        tags=["text2img", "basic", "stable-diffusion"],
-        difficulty="beginner",
-        required_models=["v1-5-pruned-emaonly-fp16.safetensors"],
-        parameters={
-            "prompt": "a beautiful landscape",
-            "negative_prompt": "blurry, low quality",
-            "width": "512",
-            "height": "512",
-            "steps": "20",
-            "cfg": "7.0",
-            "seed": "42"
-        },
-        dsl_content="""## Model Loading
+# DSL bodies for the built-in templates
+
+_TEXT2IMG_BASIC_DSL = """## Model Loading
 
 checkpoint: CheckpointLoaderSimple
   ckpt_name: v1-5-pruned-emaonly-fp16.safetensors
@@ -80,25 +69,8 @@ save: SaveImage
   images: @decode.image
   filename_prefix: text2img_basic
 """
-    ),
-    
-    "img2img": WorkflowTemplate(
-        name="Image-to-Image",
-        description="Transform existing images with text prompts",
-        category="Generation",
-        tags=["img2img", "transformation", "stable-diffusion"],
-        difficulty="beginner",
-        required_models=["v1-5-pruned-emaonly-fp16.safetensors"],
-        parameters={
-            "image_path": "input.png",
-            "prompt": "oil painting style",
-            "negative_prompt": "blurry, low quality",
-            "denoise": "0.7",
-            "steps": "20",
-            "cfg": "7.0",
-            "seed": "42"
-        },
-        dsl_content="""## Model Loading
+
+_IMG2IMG_DSL = """## Model Loading
 
 checkpoint: CheckpointLoaderSimple
   ckpt_name: v1-5-pruned-emaonly-fp16.safetensors
@@ -146,20 +118,8 @@ save: SaveImage
   images: @decode.image
   filename_prefix: img2img
 """
-    ),
-    
-    "upscaling": WorkflowTemplate(
-        name="Image Upscaling",
-        description="Upscale images using AI super-resolution",
-        category="Enhancement",
-        tags=["upscaling", "super-resolution", "enhancement"],
-        difficulty="intermediate",
-        required_models=["RealESRGAN_x4plus.pth"],
-        parameters={
-            "image_path": "input.png",
-            "upscale_factor": "4"
-        },
-        dsl_content="""## Input Image
+
+_UPSCALING_DSL = """## Input Image
 
 load_image: LoadImage
   image: {image_path}
@@ -176,25 +136,8 @@ save: SaveImage
   images: @upscaler.image
   filename_prefix: upscaled_{upscale_factor}x
 """
-    ),
-    
-    "inpainting": WorkflowTemplate(
-        name="Inpainting",
-        description="Fill masked areas of images with AI-generated content",
-        category="Editing",
-        tags=["inpainting", "editing", "mask", "stable-diffusion"],
-        difficulty="intermediate",
-        required_models=["v1-5-inpainting.ckpt"],
-        parameters={
-            "image_path": "input.png",
-            "mask_path": "mask.png",
-            "prompt": "beautiful garden",
-            "negative_prompt": "blurry, artifacts",
-            "steps": "20",
-            "cfg": "7.0",
-            "seed": "42"
-        },
-        dsl_content="""## Model Loading
+
+_INPAINTING_DSL = """## Model Loading
 
 checkpoint: CheckpointLoaderSimple
   ckpt_name: v1-5-inpainting.ckpt
@@ -249,27 +192,8 @@ save: SaveImage
   images: @decode.image
   filename_prefix: inpainted
 """
-    ),
-    
-    "controlnet_pose": WorkflowTemplate(
-        name="ControlNet Pose Control",
-        description="Generate images following pose guidance from reference image",
-        category="Controlled Generation",
-        tags=["controlnet", "pose", "guided-generation"],
-        difficulty="advanced",
-        required_models=["v1-5-pruned-emaonly-fp16.safetensors", "control_v11p_sd15_openpose.pth"],
-        parameters={
-            "pose_image": "pose_reference.png",
-            "prompt": "professional dancer in elegant attire",
-            "negative_prompt": "blurry, deformed, low quality",
-            "width": "512",
-            "height": "512",
-            "steps": "20",
-            "cfg": "7.0",
-            "seed": "42",
-            "control_strength": "1.0"
-        },
-        dsl_content="""## Model Loading
+
+_CONTROLNET_POSE_DSL = """## Model Loading
 
 checkpoint: CheckpointLoaderSimple
   ckpt_name: v1-5-pruned-emaonly-fp16.safetensors
@@ -329,24 +253,8 @@ save: SaveImage
   images: @decode.image
   filename_prefix: controlnet_pose
 """
-    ),
-    
-    "batch_processing": WorkflowTemplate(
-        name="Batch Image Processing",
-        description="Process multiple images with the same workflow",
-        category="Batch Operations",
-        tags=["batch", "automation", "processing"],
-        difficulty="intermediate",
-        required_models=["v1-5-pruned-emaonly-fp16.safetensors"],
-        parameters={
-            "input_directory": "input_images/",
-            "prompt": "enhanced and improved",
-            "negative_prompt": "blurry, artifacts",
-            "steps": "15",
-            "cfg": "7.0",
-            "denoise": "0.5"
-        },
-        dsl_content="""## Model Loading
+
+_BATCH_PROCESSING_DSL = """## Model Loading
 
 checkpoint: CheckpointLoaderSimple
   ckpt_name: v1-5-pruned-emaonly-fp16.safetensors
@@ -400,24 +308,8 @@ save: SaveImage
   images: @decode.image
   filename_prefix: batch_processed
 """
-    ),
-    
-    "style_transfer": WorkflowTemplate(
-        name="Style Transfer",
-        description="Apply artistic style from one image to another",
-        category="Artistic",
-        tags=["style-transfer", "artistic", "neural-style"],
-        difficulty="advanced",
-        required_models=["v1-5-pruned-emaonly-fp16.safetensors"],
-        parameters={
-            "content_image": "content.png",
-            "style_image": "style.png",
-            "style_strength": "0.8",
-            "steps": "25",
-            "cfg": "7.5",
-            "seed": "42"
-        },
-        dsl_content="""## Model Loading
+
+_STYLE_TRANSFER_DSL = """## Model Loading
 
 checkpoint: CheckpointLoaderSimple
   ckpt_name: v1-5-pruned-emaonly-fp16.safetensors
@@ -480,38 +372,233 @@ save: SaveImage
   images: @decode.image
   filename_prefix: style_transfer
 """
-    ),
-}
+
+
+# Template metadata rows: (key, WorkflowTemplate kwargs)
+_ROWS = (
+    ("text2img_basic", {
+        "name": "Basic Text-to-Image",
+        "description": "Simple text-to-image generation with basic prompting",
+        "category": "Generation",
+        "tags": ["text2img", "basic", "stable-diffusion"],
+        "difficulty": "beginner",
+        "required_models": ["v1-5-pruned-emaonly-fp16.safetensors"],
+        "parameters": {
+            "prompt": "a beautiful landscape",
+            "negative_prompt": "blurry, low quality",
+            "width": "512",
+            "height": "512",
+            "steps": "20",
+            "cfg": "7.0",
+            "seed": "42"
+        },
+        "dsl_content": _TEXT2IMG_BASIC_DSL,
+    }),
+    ("img2img", {
+        "name": "Image-to-Image",
+        "description": "Transform existing images with text prompts",
+        "category": "Generation",
+        "tags": ["img2img", "transformation", "stable-diffusion"],
+        "difficulty": "beginner",
+        "required_models": ["v1-5-pruned-emaonly-fp16.safetensors"],
+        "parameters": {
+            "image_path": "input.png",
+            "prompt": "oil painting style",
+            "negative_prompt": "blurry, low quality",
+            "denoise": "0.7",
+            "steps": "20",
+            "cfg": "7.0",
+            "seed": "42"
+        },
+        "dsl_content": _IMG2IMG_DSL,
+    }),
+    ("upscaling", {
+        "name": "Image Upscaling",
+        "description": "Upscale images using AI super-resolution",
+        "category": "Enhancement",
+        "tags": ["upscaling", "super-resolution", "enhancement"],
+        "difficulty": "intermediate",
+        "required_models": ["RealESRGAN_x4plus.pth"],
+        "parameters": {
+            "image_path": "input.png",
+            "upscale_factor": "4"
+        },
+        "dsl_content": _UPSCALING_DSL,
+    }),
+    ("inpainting", {
+        "name": "Inpainting",
+        "description": "Fill masked areas of images with AI-generated content",
+        "category": "Editing",
+        "tags": ["inpainting", "editing", "mask", "stable-diffusion"],
+        "difficulty": "intermediate",
+        "required_models": ["v1-5-inpainting.ckpt"],
+        "parameters": {
+            "image_path": "input.png",
+            "mask_path": "mask.png",
+            "prompt": "beautiful garden",
+            "negative_prompt": "blurry, artifacts",
+            "steps": "20",
+            "cfg": "7.0",
+            "seed": "42"
+        },
+        "dsl_content": _INPAINTING_DSL,
+    }),
+    ("controlnet_pose", {
+        "name": "ControlNet Pose Control",
+        "description": "Generate images following pose guidance from reference image",
+        "category": "Controlled Generation",
+        "tags": ["controlnet", "pose", "guided-generation"],
+        "difficulty": "advanced",
+        "required_models": ["v1-5-pruned-emaonly-fp16.safetensors", "control_v11p_sd15_openpose.pth"],
+        "parameters": {
+            "pose_image": "pose_reference.png",
+            "prompt": "professional dancer in elegant attire",
+            "negative_prompt": "blurry, deformed, low quality",
+            "width": "512",
+            "height": "512",
+            "steps": "20",
+            "cfg": "7.0",
+            "seed": "42",
+            "control_strength": "1.0"
+        },
+        "dsl_content": _CONTROLNET_POSE_DSL,
+    }),
+    ("batch_processing", {
+        "name": "Batch Image Processing",
+        "description": "Process multiple images with the same workflow",
+        "category": "Batch Operations",
+        "tags": ["batch", "automation", "processing"],
+        "difficulty": "intermediate",
+        "required_models": ["v1-5-pruned-emaonly-fp16.safetensors"],
+        "parameters": {
+            "input_directory": "input_images/",
+            "prompt": "enhanced and improved",
+            "negative_prompt": "blurry, artifacts",
+            "steps": "15",
+            "cfg": "7.0",
+            "denoise": "0.5"
+        },
+        "dsl_content": _BATCH_PROCESSING_DSL,
+    }),
+    ("style_transfer", {
+        "name": "Style Transfer",
+        "description": "Apply artistic style from one image to another",
+        "category": "Artistic",
+        "tags": ["style-transfer", "artistic", "neural-style"],
+        "difficulty": "advanced",
+        "required_models": ["v1-5-pruned-emaonly-fp16.safetensors"],
+        "parameters": {
+            "content_image": "content.png",
+            "style_image": "style.png",
+            "style_strength": "0.8",
+            "steps": "25",
+            "cfg": "7.5",
+            "seed": "42"
+        },
+        "dsl_content": _STYLE_TRANSFER_DSL,
+    }),
+)
+
+
+@cache
+def builtin_templates() -> "types.MappingProxyType[str, WorkflowTemplate]":
+    """The built-in templates, constructed on first use.
+    
+    Returns a read-only view with interned keys; keeps pages clean when forked
+    workers share it.
+    """
+    return types.MappingProxyType(
+        {sys.intern(key): WorkflowTemplate(**row) for key, row in _ROWS}
+    )
+
+
+def __getattr__(name: str):
+    # PEP 562: TEMPLATES is only built when something first asks for it
+    if name == "TEMPLATES":
+        templates = globals()["TEMPLATES"] = builtin_templates()
+        return templates
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _tokenize(dsl: str) -> List[Tuple[str, Optional[str], Optional[str], Optional[str]]]:
+    """Split DSL content into (literal, field, format_spec, conversion) tokens."""
+    return list(string.Formatter().parse(dsl))
+
+
+@cache
+def _tokens() -> Dict[str, List[Tuple[str, Optional[str], Optional[str], Optional[str]]]]:
+    """Pre-tokenized DSL content so rendering never re-scans for placeholders."""
+    return {name: _tokenize(t.dsl_content) for name, t in builtin_templates().items()}
+
+
+def render_dsl(name: str, params: Dict[str, str]) -> str:
+    """Render a template's DSL with parameter values substituted.
+    
+    Placeholders without a matching parameter are left in place.
+    """
+    return _render_cached(name, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+
+# Built-in templates are read-only, so rendered output never goes stale
+@lru_cache(maxsize=256)
+def _render_cached(name: str, param_items: Tuple[Tuple[str, str], ...]) -> str:
+    """Render a template from a hashable, sorted parameter tuple."""
+    params = dict(param_items)
+    parts = []
+    for literal, field, format_spec, conversion in _tokens()[name]:
+        parts.append(literal)
+        if field is None:
+            continue
+        if field in params:
+            parts.append(params[field])
+        else:
+            placeholder = field
+            if conversion:
+                placeholder += f"!{conversion}"
+            if format_spec:
+                placeholder += f":{format_spec}"
+            parts.append(f"{{{placeholder}}}")
+    return "".join(parts)
 
 
 def get_template_by_name(name: str) -> Optional[WorkflowTemplate]:
     """Get a template by name."""
-    return TEMPLATES.get(name)
+    return builtin_templates().get(name)
 
 
 def get_templates_by_category(category: str) -> List[WorkflowTemplate]:
     """Get all templates in a category."""
-    return [t for t in TEMPLATES.values() if t.category == category]
+    return [t for t in builtin_templates().values() if t.category == category]
 
 
 def get_templates_by_tag(tag: str) -> List[WorkflowTemplate]:
     """Get all templates with a specific tag."""
-    return [t for t in TEMPLATES.values() if tag in t.tags]
+    return [t for t in builtin_templates().values() if tag in t.tags]
 
 
 def get_templates_by_difficulty(difficulty: str) -> List[WorkflowTemplate]:
     """Get all templates of a specific difficulty level."""
-    return [t for t in TEMPLATES.values() if t.difficulty == difficulty]
+    return [t for t in builtin_templates().values() if t.difficulty == difficulty]
 
 
 def list_all_categories() -> List[str]:
     """Get all unique categories."""
-    return list(set(t.category for t in TEMPLATES.values()))
+    return list(_all_categories_sorted())
 
 
 def list_all_tags() -> List[str]:
     """Get all unique tags."""
-    tags = set()
-    for template in TEMPLATES.values():
-        tags.update(template.tags)
-    return sorted(list(tags))
\ No newline at end of file
+    return list(_all_tags_sorted())
+
+
+# Templates are static, so the unique categories and tags are computed once
+@cache
+def _all_categories_sorted() -> Tuple[str, ...]:
+    return tuple(sorted(frozenset(t.category for t in builtin_templates().values())))
+
+
+@cache
+def _all_tags_sorted() -> Tuple[str, ...]:
+    return tuple(sorted(frozenset(
+        itertools.chain.from_iterable(t.tags for t in builtin_templates().values())
+    )))
@@ -4,13 +4,14 @@
 import asyncio
 import argparse
 import json
+import os
 import sys
 from pathlib import Path
 
 # Add the project root to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from comfy_mcp.templates.official import official_manager
+from comfy_mcp.templates.official import official_manager, read_cache_stream
 from comfy_mcp.templates.sync_config import SyncConfig
 
 
@@ -86,6 +87,19 @@ async def sync_templates(args):
         return 1
 
 
+def _open_for_sequential_read(path: Path):
+    """Open a file for reading, hinting the kernel to prefetch it."""
+    fd = os.open(path, os.O_RDONLY)
+    if hasattr(os, "posix_fadvise"):
+        # Start readahead now so disk I/O overlaps with JSON parsing
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+    return os.fdopen(fd, 'rb')
+
+
 def show_cache_info(args):
     """Show information about cached templates."""
     cache_dir = Path(args.cache_dir) if args.cache_dir else official_manager.cache_dir
@@ -96,16 +110,13 @@ def show_cache_info(args):
         return 1
     
     try:
-        with open(cache_file, 'r') as f:
-            cache_data = json.load(f)
-        
-        metadata = cache_data.get("metadata", {})
-        templates = cache_data.get("templates", cache_data)
+        with _open_for_sequential_read(cache_file) as f:
+            metadata, templates = read_cache_stream(f)
         
         print(f"📁 Cache File: {cache_file}")
         print(f"📊 Cache Info:")
         print(f"  File size: {cache_file.stat().st_size / 1024:.1f} KB")
-        print(f"  Template count: {len([k for k in templates.keys() if k != 'metadata'])}")
+        print(f"  Template count: {len(templates)}")
         
         if metadata:
             import time
@@ -134,7 +145,7 @@ def main():
     
     # Sync command
     sync_parser = subparsers.add_parser("sync", help="Sync official templates")
-    sync_parser.add_argument("--max-concurrent", type=int, help="Maximum concurrent downloads")
+    sync_parser.add_argument("--max-concurrent", type=int, help="Maximum concurrent downloads per pipelined batch")
     sync_parser.add_argument("--timeout", type=int, help="Request timeout in seconds")
     sync_parser.add_argument("--cache-dir", help="Cache directory path")
     sync_parser.add_argument("--show-samples", action="store_true", help="Show sample templates")
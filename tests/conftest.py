@@ -1,15 +1,94 @@
 """Pytest configuration and shared fixtures."""
 
 import pytest
+import copy
 import json
+import sys
+from collections import deque
 from pathlib import Path
 from typing import Dict, Any
 
-import comfy_mcp
-from comfy_mcp.dsl import DSLParser, DslToJsonConverter, JsonToDslConverter
+from comfy_mcp.dsl import DSLParser, DslToJsonConverter, JsonToDslConverter, Workflow
+from comfy_mcp.templates import TemplateManager
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
-@pytest.fixture
+
+# Sample ComfyUI JSON workflow, serialized once for file fixtures
+_SAMPLE_JSON: Dict[str, Any] = {
+    "1": {
+        "class_type": "CheckpointLoaderSimple",
+        "inputs": {
+            "ckpt_name": "v1-5-pruned-emaonly-fp16.safetensors"
+        }
+    },
+    "2": {
+        "class_type": "CLIPTextEncode", 
+        "inputs": {
+            "text": "a cat",
+            "clip": ["1", 1]
+        }
+    },
+    "3": {
+        "class_type": "CLIPTextEncode",
+        "inputs": {
+            "text": "blurry", 
+            "clip": ["1", 1]
+        }
+    },
+    "4": {
+        "class_type": "EmptyLatentImage",
+        "inputs": {
+            "width": 512,
+            "height": 512,
+            "batch_size": 1
+        }
+    },
+    "5": {
+        "class_type": "KSampler",
+        "inputs": {
+            "seed": 42,
+            "steps": 5,
+            "cfg": 7.0,
+            "sampler_name": "euler",
+            "scheduler": "normal",
+            "denoise": 1.0,
+            "model": ["1", 0],
+            "positive": ["2", 0],
+            "negative": ["3", 0],
+            "latent_image": ["4", 0]
+        }
+    },
+    "6": {
+        "class_type": "VAEDecode",
+        "inputs": {
+            "samples": ["5", 0],
+            "vae": ["1", 2]
+        }
+    },
+    "7": {
+        "class_type": "SaveImage",
+        "inputs": {
+            "images": ["6", 0],
+            "filename_prefix": "test"
+        }
+    }
+}
+
+_SAMPLE_JSON_BYTES = json.dumps(_SAMPLE_JSON).encode()
+
+
+if uvloop is not None and sys.platform != "win32":
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_asyncio_loop_factories(config, item):
+        """Run async tests on uvloop when it is installed (not available on Windows)."""
+        return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest.fixture(scope="session")
 def sample_dsl() -> str:
     """Sample DSL workflow for testing."""
     return '''## Model Loading
@@ -58,93 +137,127 @@ save: SaveImage
 '''
 
 
-@pytest.fixture
-def sample_json() -> Dict[str, Any]:
-    """Sample ComfyUI JSON workflow for testing."""
+@pytest.fixture(scope="session")
+def sample_ast(sample_dsl: str) -> Workflow:
+    """Sample DSL workflow parsed once per session (treat as read-only)."""
+    return DSLParser().parse(sample_dsl)
+
+
+@pytest.fixture(scope="session")
+def sample_ast_json(sample_ast: Workflow) -> Dict[str, Any]:
+    """Sample AST converted to ComfyUI JSON once per session (treat as read-only)."""
+    return DslToJsonConverter().convert(sample_ast)
+
+
+@pytest.fixture(scope="session")
+def sample_dsl_stats(sample_ast: Workflow) -> Dict[str, int]:
+    """Node and section counts derived from the sample DSL."""
     return {
-        "1": {
-            "class_type": "CheckpointLoaderSimple",
-            "inputs": {
-                "ckpt_name": "v1-5-pruned-emaonly-fp16.safetensors"
-            }
-        },
-        "2": {
-            "class_type": "CLIPTextEncode", 
-            "inputs": {
-                "text": "a cat",
-                "clip": ["1", 1]
-            }
-        },
-        "3": {
-            "class_type": "CLIPTextEncode",
-            "inputs": {
-                "text": "blurry", 
-                "clip": ["1", 1]
-            }
-        },
-        "4": {
-            "class_type": "EmptyLatentImage",
-            "inputs": {
-                "width": 512,
-                "height": 512,
-                "batch_size": 1
-            }
-        },
-        "5": {
-            "class_type": "KSampler",
-            "inputs": {
-                "seed": 42,
-                "steps": 5,
-                "cfg": 7.0,
-                "sampler_name": "euler",
-                "scheduler": "normal",
-                "denoise": 1.0,
-                "model": ["1", 0],
-                "positive": ["2", 0],
-                "negative": ["3", 0],
-                "latent_image": ["4", 0]
-            }
-        },
-        "6": {
-            "class_type": "VAEDecode",
-            "inputs": {
-                "samples": ["5", 0],
-                "vae": ["1", 2]
-            }
-        },
-        "7": {
-            "class_type": "SaveImage",
-            "inputs": {
-                "images": ["6", 0],
-                "filename_prefix": "test"
-            }
-        }
+        "nodes": sum(len(section.nodes) for section in sample_ast.sections),
+        "sections": len(sample_ast.sections),
     }
 
 
 @pytest.fixture
+def sample_json() -> Dict[str, Any]:
+    """Sample ComfyUI JSON workflow (a fresh copy per test)."""
+    return copy.deepcopy(_SAMPLE_JSON)
+
+
+@pytest.fixture(scope="session")
 def dsl_parser() -> DSLParser:
     """DSL parser instance."""
     return DSLParser()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def dsl_to_json_converter() -> DslToJsonConverter:
     """DSL to JSON converter instance.""" 
     return DslToJsonConverter()
 
 
-@pytest.fixture 
+@pytest.fixture(scope="session")
 def json_to_dsl_converter() -> JsonToDslConverter:
     """JSON to DSL converter instance."""
     return JsonToDslConverter()
 
 
+@pytest.fixture(scope="session")
+def template_manager() -> TemplateManager:
+    """Template manager shared across the session."""
+    return TemplateManager()
+
+
+@pytest.fixture(scope="session")
+def properties_workflow(dsl_parser: DSLParser) -> Workflow:
+    """Single node covering every property value type."""
+    return dsl_parser.parse('''## Test
+
+node1: NodeType
+  text_prop: hello world
+  int_prop: 42
+  float_prop: 3.14
+  bool_prop: true
+  connection_prop: @other.output
+''')
+
+
+@pytest.fixture(scope="session")
+def connections_workflow(dsl_parser: DSLParser) -> Workflow:
+    """Two nodes joined by two connections."""
+    return dsl_parser.parse('''## Test
+
+input_node: InputType
+  param: value
+
+output_node: OutputType
+  input_param: @input_node.output
+  another_input: @input_node.model
+''')
+
+
+@pytest.fixture(scope="session")
+def single_connection_workflow(dsl_parser: DSLParser) -> Workflow:
+    """Two nodes joined by a single connection."""
+    return dsl_parser.parse('''## Test
+
+input_node: InputType
+  param: value
+
+output_node: OutputType
+  connection_param: @input_node.output
+''')
+
+
+@pytest.fixture(scope="session")
+def typed_properties_workflow(dsl_parser: DSLParser) -> Workflow:
+    """Single node with string, int, float and bool properties."""
+    return dsl_parser.parse('''## Test
+
+test_node: TestType
+  string_param: hello world
+  int_param: 42
+  float_param: 3.14
+  bool_param: true
+''')
+
+
+@pytest.fixture(scope="session")
+def simple_node_workflow(dsl_parser: DSLParser) -> Workflow:
+    """Single node with two plain properties."""
+    return dsl_parser.parse('''## Test
+
+test_node: TestType
+  param1: value1
+  param2: 42
+''')
+
+
 @pytest.fixture
-def temp_workflow_file(tmp_path: Path, sample_json: Dict[str, Any]) -> Path:
+def temp_workflow_file(tmp_path: Path) -> Path:
     """Create a temporary workflow JSON file."""
     workflow_file = tmp_path / "test_workflow.json"
-    workflow_file.write_text(json.dumps(sample_json, indent=2))
+    workflow_file.write_bytes(_SAMPLE_JSON_BYTES)
     return workflow_file
 
 
@@ -160,15 +273,19 @@ class MockContext:
     """Mock MCP context for testing."""
     
     def __init__(self):
-        self.messages = []
+        self.messages = deque()
+    
+    def record(self, kind: str, message: str):
+        """Record a message synchronously, skipping the coroutine round-trip."""
+        self.messages.append((kind, message))
     
     async def info(self, message: str):
         """Mock info method."""
-        self.messages.append(("info", message))
+        self.record("info", message)
     
     async def error(self, message: str):
         """Mock error method."""
-        self.messages.append(("error", message))
+        self.record("error", message)
 
 
 @pytest.fixture
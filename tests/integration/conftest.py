@@ -0,0 +1,32 @@
+"""Shared fixtures for integration tests."""
+
+import pytest
+
+from comfy_mcp.templates.official import OfficialTemplate, official_manager
+
+
+@pytest.fixture
+def patched_official(monkeypatch, mock_official_templates):
+    """Point the official manager at the test's mock templates."""
+    monkeypatch.setattr(official_manager, "templates", mock_official_templates)
+    return mock_official_templates
+
+
+@pytest.fixture(scope="module")
+def large_mock_templates():
+    """Fifty minimal official templates for search benchmarks."""
+    return {
+        f"template_{i}": OfficialTemplate(
+            name=f"Template {i}",
+            description=f"Test template number {i}",
+            category="Test",
+            workflow_json={}
+        )
+        for i in range(50)
+    }
+
+
+@pytest.fixture
+def all_templates(template_manager, patched_official):
+    """Combined custom and official listing with official templates patched."""
+    return template_manager.list_templates(include_official=True)
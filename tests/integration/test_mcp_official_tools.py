@@ -1,23 +1,30 @@
 """Integration tests for MCP tools with official templates."""
 
 import pytest
-from unittest.mock import patch, AsyncMock
-from fastmcp import Context
-from comfy_mcp.templates.official import OfficialTemplate
+from collections import Counter
+from comfy_mcp.mcp.server import template_manager
+from comfy_mcp.templates.official import OfficialTemplate, official_manager
+
+
+class _StubContext:
+    """Minimal async stand-in for the MCP context used by these tools."""
+    
+    async def info(self, *args, **kwargs):
+        """Stub info method."""
+    
+    async def warning(self, *args, **kwargs):
+        """Stub warning method."""
 
 
 class TestMCPOfficialTools:
     """Test MCP tools for official template functionality."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_context(self):
         """Create mock MCP context."""
-        context = AsyncMock(spec=Context)
-        context.info = AsyncMock()
-        context.warning = AsyncMock()
-        return context
+        return _StubContext()
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_official_templates(self):
         """Mock official templates for testing."""
         return {
@@ -38,130 +45,122 @@ class TestMCPOfficialTools:
             )
         }
     
+    @pytest.fixture(autouse=True)
+    def _patch_official(self, monkeypatch, mock_official_templates):
+        """Swap in the mock official templates for every test in this class."""
+        monkeypatch.setattr(official_manager, "templates", mock_official_templates)
+    
     def test_template_manager_includes_official(self, mock_context, mock_official_templates):
         """Test that template manager includes official templates."""
-        from comfy_mcp.mcp.server import template_manager
-        from comfy_mcp.templates.official import official_manager
+        result = template_manager.list_templates(include_official=True)
+        
+        # Partition by source and pick out the target in a single pass
+        custom_templates, official_templates, official_test = [], [], None
+        for t in result:
+            if t.get("source") == "custom":
+                custom_templates.append(t)
+            elif t.get("source") == "official":
+                official_templates.append(t)
+                if t["name"] == "official_test":
+                    official_test = t
+        
+        # Should have both custom and official templates
+        assert len(custom_templates) > 0
+        assert len(official_templates) == 2
         
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            result = template_manager.list_templates(include_official=True)
-            
-            # Should have both custom and official templates
-            custom_templates = [t for t in result if t.get("source") == "custom"]
-            official_templates = [t for t in result if t.get("source") == "official"]
-            
-            assert len(custom_templates) > 0
-            assert len(official_templates) == 2
-            
-            # Check official template structure
-            official_test = next(t for t in official_templates if t["name"] == "official_test")
-            assert official_test["display_name"] == "Official Test Template"
-            assert official_test["category"] == "Testing"
-            assert official_test["has_dsl"] is True
+        # Check official template structure
+        assert official_test is not None
+        assert official_test["display_name"] == "Official Test Template"
+        assert official_test["category"] == "Testing"
+        assert official_test["has_dsl"] is True
     
     def test_template_manager_filtering(self, mock_context, mock_official_templates):
         """Test template manager filtering with official templates."""
-        from comfy_mcp.mcp.server import template_manager
-        from comfy_mcp.templates.official import official_manager
+        # Filter by category
+        result = template_manager.search_templates(category="Testing", include_official=True)
+        testing_templates = [t for t in result if t["category"] == "Testing"]
+        assert len(testing_templates) > 0
         
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # Filter by category
-            result = template_manager.search_templates(category="Testing", include_official=True)
-            testing_templates = [t for t in result if t["category"] == "Testing"]
-            assert len(testing_templates) > 0
-            
-            # Filter by source (custom only)
-            custom_result = template_manager.search_templates(source="custom", include_official=True)
-            assert all(t.get("source") == "custom" for t in custom_result)
-            
-            # Filter by source (official only) 
-            official_result = template_manager.search_templates(source="official", include_official=True)
-            assert all(t.get("source") == "official" for t in official_result)
-            assert len(official_result) == 2
+        # Filter by source (custom only)
+        custom_result = template_manager.search_templates(source="custom", include_official=True)
+        assert all(t.get("source") == "custom" for t in custom_result)
+        
+        # Filter by source (official only) 
+        official_result = template_manager.search_templates(source="official", include_official=True)
+        assert all(t.get("source") == "official" for t in official_result)
+        assert len(official_result) == 2
     
-    @pytest.mark.asyncio
-    async def test_sync_official_templates_functionality(self, mock_context):
+    async def test_sync_official_templates_functionality(self, mock_context, monkeypatch):
         """Test sync_official_templates functionality."""
-        from comfy_mcp.mcp.server import template_manager
-        
         mock_result = {
             "status": "success",
             "synced_count": 3,
             "templates": ["template1", "template2", "template3"]
         }
         
-        with patch.object(template_manager, 'sync_official_templates', return_value=mock_result) as mock_sync:
-            result = await template_manager.sync_official_templates()
-            
-            assert result["status"] == "success"
-            assert result["synced_count"] == 3
-            assert len(result["templates"]) == 3
-            mock_sync.assert_called_once()
+        calls = []
+        
+        async def fake_sync(*args, **kwargs):
+            calls.append((args, kwargs))
+            return mock_result
+        
+        monkeypatch.setattr(template_manager, 'sync_official_templates', fake_sync)
+        result = await template_manager.sync_official_templates()
+        
+        assert result["status"] == "success"
+        assert result["synced_count"] == 3
+        assert len(result["templates"]) == 3
+        assert len(calls) == 1
     
-    @pytest.mark.asyncio
-    async def test_sync_official_templates_error_handling(self, mock_context):
+    async def test_sync_official_templates_error_handling(self, mock_context, monkeypatch):
         """Test sync_official_templates handles errors."""
-        from comfy_mcp.mcp.server import template_manager
-        
         mock_error_result = {
             "status": "error", 
             "error": "API rate limit exceeded"
         }
         
-        with patch.object(template_manager, 'sync_official_templates', return_value=mock_error_result):
-            result = await template_manager.sync_official_templates()
-            
-            assert result["status"] == "error"
-            assert "error" in result
+        async def fake_sync(*args, **kwargs):
+            return mock_error_result
+        
+        monkeypatch.setattr(template_manager, 'sync_official_templates', fake_sync)
+        result = await template_manager.sync_official_templates()
+        
+        assert result["status"] == "error"
+        assert "error" in result
     
     def test_get_official_templates(self, mock_context, mock_official_templates):
         """Test getting official templates."""
-        from comfy_mcp.mcp.server import template_manager
-        from comfy_mcp.templates.official import official_manager
+        # Test getting specific official template
+        template = template_manager.get_official_template("official_test")
+        assert template is not None
+        assert template.name == "Official Test Template"
         
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # Test getting specific official template
-            template = template_manager.get_official_template("official_test")
-            assert template is not None
-            assert template.name == "Official Test Template"
-            
-            # Test non-existent template
-            template = template_manager.get_official_template("nonexistent")
-            assert template is None
+        # Test non-existent template
+        template = template_manager.get_official_template("nonexistent")
+        assert template is None
     
     def test_generate_workflow_from_official(self, mock_context, mock_official_templates):
         """Test generating workflow from official template."""
-        from comfy_mcp.mcp.server import template_manager
-        from comfy_mcp.templates.official import official_manager
+        # Generate from official template
+        result = template_manager.generate_workflow("official_test", source="official")
         
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # Generate from official template
-            result = template_manager.generate_workflow("official_test", source="official")
-            
-            assert result is not None
-            assert isinstance(result, str)
-            assert "TestNode" in result
-            assert "param: value" in result
+        assert result is not None
+        assert isinstance(result, str)
+        assert "TestNode" in result
+        assert "param: value" in result
     
     def test_generate_workflow_with_auto_source(self, mock_context, mock_official_templates):
         """Test generate workflow with auto source detection."""
-        from comfy_mcp.mcp.server import template_manager
-        from comfy_mcp.templates.official import official_manager
+        # Should find custom template first
+        result = template_manager.generate_workflow("text2img_basic", source="auto")
+        assert "CheckpointLoaderSimple" in result  # Custom template content
         
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # Should find custom template first
-            result = template_manager.generate_workflow("text2img_basic", source="auto")
-            assert "CheckpointLoaderSimple" in result  # Custom template content
-            
-            # Should find official template when custom doesn't exist
-            result = template_manager.generate_workflow("official_test", source="auto")
-            assert "TestNode" in result  # Official template content
+        # Should find official template when custom doesn't exist
+        result = template_manager.generate_workflow("official_test", source="auto")
+        assert "TestNode" in result  # Official template content
     
-    def test_generate_workflow_with_parameters(self, mock_context):
+    def test_generate_workflow_with_parameters(self, mock_context, monkeypatch):
         """Test generate workflow with parameter substitution."""
-        from comfy_mcp.mcp.server import template_manager
-        from comfy_mcp.templates.official import official_manager
-        
         # Create template with parameters
         template_with_params = {
             "param_template": OfficialTemplate(
@@ -173,33 +172,29 @@ class TestMCPOfficialTools:
             )
         }
         
-        with patch.object(official_manager, 'templates', template_with_params):
-            result = template_manager.generate_workflow(
-                "param_template",
-                source="official", 
-                parameters={"prompt": "test prompt", "steps": "20"}
-            )
-            
-            assert "prompt: test prompt" in result
-            assert "steps: 20" in result
+        monkeypatch.setattr(official_manager, 'templates', template_with_params)
+        result = template_manager.generate_workflow(
+            "param_template",
+            source="official", 
+            parameters={"prompt": "test prompt", "steps": "20"}
+        )
+        
+        assert "prompt: test prompt" in result
+        assert "steps: 20" in result
     
     def test_validate_parameters_official(self, mock_context, mock_official_templates):
         """Test parameter validation for official templates."""
-        from comfy_mcp.mcp.server import template_manager
-        from comfy_mcp.templates.official import official_manager
+        # Valid parameters
+        validation = template_manager.validate_parameters(
+            "official_test", 
+            {"param": "test value"},
+            source="official"
+        )
         
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # Valid parameters
-            validation = template_manager.validate_parameters(
-                "official_test", 
-                {"param": "test value"},
-                source="official"
-            )
-            
-            # The validation should work even if it finds issues
-            assert "valid" in validation
-            assert "errors" in validation
-            assert "warnings" in validation
+        # The validation should work even if it finds issues
+        assert "valid" in validation
+        assert "errors" in validation
+        assert "warnings" in validation
 
 
 class TestTemplateManagerWithOfficialIntegration:
@@ -208,10 +203,9 @@ class TestTemplateManagerWithOfficialIntegration:
     @pytest.fixture
     def template_manager(self):
         """Get template manager instance."""
-        from comfy_mcp.mcp.server import template_manager
         return template_manager
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_official_templates(self):
         return {
             "integration_test": OfficialTemplate(
@@ -223,42 +217,33 @@ class TestTemplateManagerWithOfficialIntegration:
             )
         }
     
-    def test_search_across_sources(self, template_manager, mock_official_templates):
+    def test_search_across_sources(self, template_manager, mock_official_templates, monkeypatch):
         """Test searching across both custom and official sources."""
-        from comfy_mcp.templates.official import official_manager
+        monkeypatch.setattr(official_manager, 'templates', mock_official_templates)
+        # Search for text-related templates (should find custom text2img templates)
+        results = template_manager.search_templates(query="text", include_official=True)
+        
+        # Should at least find some templates
+        assert len(results) > 0
         
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # Search for text-related templates (should find custom text2img templates)
-            results = template_manager.search_templates(query="text", include_official=True)
-            
-            # Should find templates from both sources if available
-            sources = [r["source"] for r in results]
-            
-            # Should at least find some templates
-            assert len(results) > 0
-            
-            # Test that official templates can be found
-            official_results = template_manager.search_templates(query="integration", include_official=True)
-            official_sources = [r["source"] for r in official_results]
-            assert "official" in official_sources
+        # Test that official templates can be found
+        official_results = template_manager.search_templates(query="integration", include_official=True)
+        assert any(r["source"] == "official" for r in official_results)
     
-    def test_template_count_consistency(self, template_manager, mock_official_templates):
+    def test_template_count_consistency(self, template_manager, mock_official_templates, monkeypatch):
         """Test that template counts are consistent."""
-        from comfy_mcp.templates.official import official_manager
+        monkeypatch.setattr(official_manager, 'templates', mock_official_templates)
+        # Get all templates
+        all_templates = template_manager.list_templates(include_official=True)
+        total_count = len(all_templates)
+        
+        # Count by source in one pass
+        source_counts = Counter(t["source"] for t in all_templates)
         
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # Get all templates
-            all_templates = template_manager.list_templates(include_official=True)
-            total_count = len(all_templates)
-            
-            # Count by source
-            custom_count = len([t for t in all_templates if t["source"] == "custom"])
-            official_count = len([t for t in all_templates if t["source"] == "official"])
-            
-            assert total_count == custom_count + official_count
-            assert official_count == len(mock_official_templates)
+        assert total_count == source_counts["custom"] + source_counts["official"]
+        assert source_counts["official"] == len(mock_official_templates)
     
-    def test_source_priority_with_same_names(self, template_manager, mock_official_templates):
+    def test_source_priority_with_same_names(self, template_manager, mock_official_templates, monkeypatch):
         """Test that custom templates take priority with auto source."""
         # Create official template with same name as custom template
         mock_templates = {
@@ -271,14 +256,12 @@ class TestTemplateManagerWithOfficialIntegration:
             )
         }
         
-        from comfy_mcp.templates.official import official_manager
+        monkeypatch.setattr(official_manager, 'templates', mock_templates)
+        # With auto source, should prefer custom template
+        custom_dsl = template_manager.generate_workflow("text2img_basic", source="auto")
+        official_dsl = template_manager.generate_workflow("text2img_basic", source="official")
         
-        with patch.object(official_manager, 'templates', mock_templates):
-            # With auto source, should prefer custom template
-            custom_dsl = template_manager.generate_workflow("text2img_basic", source="auto")
-            official_dsl = template_manager.generate_workflow("text2img_basic", source="official")
-            
-            # Should get different content
-            assert "CheckpointLoaderSimple" in custom_dsl  # Custom template content
-            assert "OfficialNode" in official_dsl  # Official template content
-            assert custom_dsl != official_dsl
\ No newline at end of file
+        # Should get different content
+        assert "CheckpointLoaderSimple" in custom_dsl  # Custom template content
+        assert "OfficialNode" in official_dsl  # Official template content
+        assert custom_dsl != official_dsl
\ No newline at end of file
@@ -1,71 +1,77 @@
 """Integration tests for MCP tools."""
 
+import os
+import asyncio
 import pytest
-import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Dict, Union
 
-from comfy_mcp.dsl import DSLParser
+from comfy_mcp.mcp import server
+from comfy_mcp.mcp.server import (
+    JsonToDslConverter, is_full_workflow_format, full_workflow_to_simplified,
+    ToolError, Connection, Counter
+)
+from comfy_mcp.dsl import DSLParser, Workflow
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 
 # Import the actual tool functions for testing
 # We'll need to test them directly since they're wrapped by FastMCP
 async def read_workflow_direct(ctx, filepath: str) -> str:
     """Direct import of read_workflow for testing."""
-    from comfy_mcp.mcp.server import (
-        DSLParser, JsonToDslConverter, is_full_workflow_format, 
-        full_workflow_to_simplified, ToolError
-    )
-    
     try:
-        file_path = Path(filepath).resolve()
-        if not file_path.exists():
-            raise ToolError(f"File not found: {filepath}")
+        # A single read both checks existence and loads; no resolve/exists stats
+        try:
+            content = await asyncio.to_thread(Path(filepath).read_bytes)
+        except FileNotFoundError:
+            raise ToolError(f"File not found: {filepath}") from None
         
-        content = file_path.read_text(encoding="utf-8")
+        suffix = os.path.splitext(filepath)[1].lower()
         
-        if file_path.suffix.lower() == ".json":
+        if suffix == ".json":
             try:
-                workflow_data = json.loads(content)
-                
-                if is_full_workflow_format(workflow_data):
-                    workflow_data = full_workflow_to_simplified(workflow_data)
-                
-                converter = JsonToDslConverter()
-                workflow_ast = converter.convert(workflow_data)
-                dsl_content = str(workflow_ast)
-                
-                await ctx.info(f"Converted JSON to DSL ({len(dsl_content)} characters)")
-                return dsl_content
-                
-            except json.JSONDecodeError as e:
+                workflow_data = _json_loads(content)
+            except ValueError as e:
                 raise ToolError(f"Invalid JSON in {filepath}: {e}")
+            
+            if is_full_workflow_format(workflow_data):
+                workflow_data = full_workflow_to_simplified(workflow_data)
+            
+            converter = JsonToDslConverter()
+            workflow_ast = converter.convert(workflow_data)
+            dsl_content = str(workflow_ast)
+            
+            await ctx.info(f"Converted JSON to DSL ({len(dsl_content)} characters)")
+            return dsl_content
         
-        elif file_path.suffix.lower() == ".dsl":
+        elif suffix == ".dsl":
+            content = content.decode("utf-8")
             await ctx.info(f"Read DSL file ({len(content)} characters)")
             return content
         
         else:
-            raise ToolError(f"Unsupported file format: {file_path.suffix}")
+            raise ToolError(f"Unsupported file format: {suffix}")
         
     except Exception as e:
         raise ToolError(f"Failed to read workflow: {e}")
 
 
-async def validate_workflow_direct(ctx, dsl: str) -> Dict[str, Any]:
+async def validate_workflow_direct(ctx, dsl: Union[str, Workflow]) -> Dict[str, Any]:
     """Direct import of validate_workflow for testing."""
-    from comfy_mcp.mcp.server import DSLParser
-    
     try:
-        parser = DSLParser()
-        workflow_ast = parser.parse(dsl)
+        # Accept a pre-parsed AST so tests can skip re-parsing shared samples
+        workflow_ast = dsl if isinstance(dsl, Workflow) else DSLParser().parse(dsl)
         
         return {
             "is_valid": True,
             "errors": [],
             "warnings": [],
-            "node_count": sum(len(section.nodes) for section in workflow_ast.sections),
-            "section_count": len(workflow_ast.sections)
+            "node_count": workflow_ast.node_count,
+            "section_count": workflow_ast.section_count
         }
         
     except Exception as e:
@@ -77,17 +83,17 @@ async def validate_workflow_direct(ctx, dsl: str) -> Dict[str, Any]:
         }
 
 
-async def get_workflow_info_direct(ctx, dsl: str) -> Dict[str, Any]:
+async def get_workflow_info_direct(ctx, dsl: Union[str, Workflow]) -> Dict[str, Any]:
     """Direct import of get_workflow_info for testing."""
-    from comfy_mcp.mcp.server import DSLParser, Connection, Counter, ToolError
-    
     try:
-        parser = DSLParser()
-        workflow_ast = parser.parse(dsl)
+        # Accept a pre-parsed AST so tests can skip re-parsing shared samples
+        workflow_ast = dsl if isinstance(dsl, Workflow) else DSLParser().parse(dsl)
         
-        node_types = []
+        node_type_counts = Counter()
+        node_count = 0
         sections = []
         connections = []
+        connections_append = connections.append
         
         for section in workflow_ast.sections:
             section_info = {
@@ -95,9 +101,10 @@ async def get_workflow_info_direct(ctx, dsl: str) -> Dict[str, Any]:
                 "node_count": len(section.nodes),
                 "nodes": []
             }
+            node_count += len(section.nodes)
             
             for node in section.nodes:
-                node_types.append(node.node_type)
+                node_type_counts[node.node_type] += 1
                 section_info["nodes"].append({
                     "name": node.name,
                     "type": node.node_type,
@@ -106,7 +113,7 @@ async def get_workflow_info_direct(ctx, dsl: str) -> Dict[str, Any]:
                 
                 for prop in node.properties:
                     if isinstance(prop.value, Connection):
-                        connections.append({
+                        connections_append({
                             "from": prop.value.node,
                             "output": prop.value.output,
                             "to": node.name,
@@ -115,10 +122,8 @@ async def get_workflow_info_direct(ctx, dsl: str) -> Dict[str, Any]:
             
             sections.append(section_info)
         
-        node_type_counts = dict(Counter(node_types))
-        
         return {
-            "node_count": len(node_types),
+            "node_count": node_count,
             "section_count": len(sections),
             "connection_count": len(connections),
             "node_types": node_type_counts,
@@ -133,7 +138,6 @@ async def get_workflow_info_direct(ctx, dsl: str) -> Dict[str, Any]:
 class TestMCPFileOperations:
     """Test MCP file operation tools."""
     
-    @pytest.mark.asyncio
     async def test_read_workflow_json(
         self, 
         mock_context,
@@ -147,7 +151,6 @@ class TestMCPFileOperations:
         assert "CheckpointLoaderSimple" in dsl_content
         assert "@" in dsl_content  # Should contain connections
     
-    @pytest.mark.asyncio
     async def test_read_workflow_dsl(
         self,
         mock_context, 
@@ -159,25 +162,54 @@ class TestMCPFileOperations:
         assert isinstance(dsl_content, str)
         assert "CheckpointLoaderSimple" in dsl_content
     
-    @pytest.mark.asyncio
+    async def test_read_workflow_dsl_bytes(
+        self,
+        temp_dsl_file: Path,
+        sample_dsl_stats
+    ):
+        """Test reading a DSL file as raw bytes and parsing them directly."""
+        dsl_content = await server._read_file_bytes(temp_dsl_file)
+        
+        assert isinstance(dsl_content, bytes)
+        workflow_ast = DSLParser().parse(dsl_content)
+        assert len(workflow_ast.sections) == sample_dsl_stats["sections"]
+    
+    async def test_read_workflow_reads_through_file_reader(
+        self, mock_context, sample_dsl: str, monkeypatch
+    ):
+        """Test that the read_workflow tool loads files via _read_file_bytes."""
+        requested = []
+        
+        async def fake_reader(path: Path) -> bytes:
+            requested.append(path)
+            return sample_dsl.encode("utf-8")
+        
+        monkeypatch.setattr(server, "_read_file_bytes", fake_reader)
+        dsl_content = await server.read_workflow(mock_context, "examples/virtual.dsl")
+        
+        assert requested == [Path("examples/virtual.dsl").resolve()]
+        assert dsl_content == sample_dsl
+    
+    async def test_read_workflow_tool_missing_file(self, mock_context):
+        """Test that the read_workflow tool reports a missing file."""
+        missing = server.WORKFLOWS_BASE / "missing_workflow.json"
+        with pytest.raises(ToolError, match="File not found"):
+            await server.read_workflow(mock_context, str(missing))
+    
     async def test_read_nonexistent_file(self, mock_context):
         """Test reading a nonexistent file."""
-        from comfy_mcp.mcp.server import ToolError
-        
         with pytest.raises(ToolError, match="File not found"):
             await read_workflow_direct(mock_context, "/nonexistent/file.json")
     
-    @pytest.mark.asyncio
-    async def test_validate_workflow_valid(self, mock_context, sample_dsl: str):
+    async def test_validate_workflow_valid(self, mock_context, sample_ast: Workflow):
         """Test validating a valid DSL workflow."""
-        result = await validate_workflow_direct(mock_context, sample_dsl)
+        result = await validate_workflow_direct(mock_context, sample_ast)
         
         assert result["is_valid"] is True
         assert len(result["errors"]) == 0
         assert result["node_count"] > 0
         assert result["section_count"] > 0
     
-    @pytest.mark.asyncio
     async def test_validate_workflow_invalid(self, mock_context):
         """Test validating invalid DSL."""
         invalid_dsl = "this is not valid DSL syntax"
@@ -186,24 +218,23 @@ class TestMCPFileOperations:
         assert result["is_valid"] is False
         assert len(result["errors"]) > 0
     
-    @pytest.mark.asyncio
-    async def test_get_workflow_info(self, mock_context, sample_dsl: str):
+    async def test_get_workflow_info(self, mock_context, sample_ast: Workflow, sample_dsl_stats):
         """Test getting workflow information."""
-        info = await get_workflow_info_direct(mock_context, sample_dsl)
+        info = await get_workflow_info_direct(mock_context, sample_ast)
         
-        assert info["node_count"] == 7
-        assert info["section_count"] == 4
+        assert info["node_count"] == sample_dsl_stats["nodes"]
+        assert info["section_count"] == sample_dsl_stats["sections"]
         assert info["connection_count"] > 0
         assert "CheckpointLoaderSimple" in info["node_types"]
-        assert len(info["sections"]) == 4
+        assert len(info["sections"]) == sample_dsl_stats["sections"]
         assert len(info["connections"]) > 0
 
 
 @pytest.mark.integration
+@pytest.mark.serial
 class TestMCPExecutionOperations:
     """Test MCP execution operations (requires ComfyUI running)."""
     
-    @pytest.mark.asyncio
     async def test_list_comfyui_queue(self, mock_context, comfyui_running):
         """Test listing ComfyUI queue."""
         from comfy_mcp.mcp.server import ComfyUIClient, DEFAULT_COMFYUI_SERVER
@@ -216,7 +247,6 @@ class TestMCPExecutionOperations:
         assert isinstance(queue["queue_running"], list)
         assert isinstance(queue["queue_pending"], list)
     
-    @pytest.mark.asyncio
     async def test_execute_workflow_validation(self, mock_context, comfyui_not_running):
         """Test workflow execution validation (without actual execution)."""
         from comfy_mcp.mcp.server import DSLParser, DslToJsonConverter
@@ -252,11 +282,8 @@ save: SaveImage
 class TestMCPErrorHandling:
     """Test MCP error handling."""
     
-    @pytest.mark.asyncio
     async def test_invalid_file_extension(self, mock_context, tmp_path: Path):
         """Test handling of unsupported file extensions."""
-        from comfy_mcp.mcp.server import ToolError
-        
         # Create file with unsupported extension
         invalid_file = tmp_path / "test.txt"
         invalid_file.write_text("some content")
@@ -264,11 +291,8 @@ class TestMCPErrorHandling:
         with pytest.raises(ToolError, match="Unsupported file format"):
             await read_workflow_direct(mock_context, str(invalid_file))
     
-    @pytest.mark.asyncio
     async def test_invalid_json_file(self, mock_context, tmp_path: Path):
         """Test handling of invalid JSON files."""
-        from comfy_mcp.mcp.server import ToolError
-        
         # Create invalid JSON file
         invalid_json = tmp_path / "invalid.json"
         invalid_json.write_text("{ invalid json content")
@@ -1,163 +1,167 @@
 """Integration tests for official template functionality."""
 
 import pytest
-from unittest.mock import patch, AsyncMock
-from comfy_mcp.templates import TemplateManager
+from collections import defaultdict
 from comfy_mcp.templates.official import official_manager, OfficialTemplate
 
 
+# Keep suites sharing the session template manager/parser on one xdist worker
+pytestmark = pytest.mark.xdist_group("template_manager")
+
+
+# Shared read-only mock templates, built once at import
+_T2I = OfficialTemplate(
+    name="Official Text2Img",
+    description="Official text-to-image workflow",
+    category="Generation",
+    workflow_json={"test": "data"},
+    dsl_content="## Test Official Template\n\ntest_node: TestNode\n  prompt: {prompt}",
+    preview_images=("preview.webp",)
+)
+_I2I = OfficialTemplate(
+    name="Official Img2Img",
+    description="Official image-to-image workflow",
+    category="Editing",
+    workflow_json={"test": "data"},
+    dsl_content="## Official Img2Img\n\nedit_node: EditNode\n  strength: {strength}"
+)
+_ADVANCED = OfficialTemplate(
+    name="Advanced Official",
+    description="Advanced official workflow",
+    category="Advanced",
+    workflow_json={},
+    dsl_content="## Advanced\n\nadvanced_node: AdvancedNode"
+)
+
+
+def index_templates(templates):
+    """Index a template listing by source and by name in a single pass."""
+    by_source = defaultdict(list)
+    by_name = {}
+    for t in templates:
+        by_source[t["source"]].append(t)
+        by_name[t["name"]] = t
+    return by_source, by_name
+
+
 class TestOfficialTemplateIntegration:
     """Test integration between template manager and official templates."""
     
-    @pytest.fixture
-    def template_manager(self):
-        """Create template manager for testing.""" 
-        return TemplateManager()
-    
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_official_templates(self):
         """Mock official templates for testing."""
-        return {
-            "official_text2img": OfficialTemplate(
-                name="Official Text2Img",
-                description="Official text-to-image workflow",
-                category="Generation", 
-                workflow_json={"test": "data"},
-                dsl_content="## Test Official Template\n\ntest_node: TestNode\n  prompt: {prompt}",
-                preview_images=["preview.webp"]
-            ),
-            "official_img2img": OfficialTemplate(
-                name="Official Img2Img", 
-                description="Official image-to-image workflow",
-                category="Editing",
-                workflow_json={"test": "data"},
-                dsl_content="## Official Img2Img\n\nedit_node: EditNode\n  strength: {strength}"
-            )
-        }
+        return {"official_text2img": _T2I, "official_img2img": _I2I}
     
-    def test_list_templates_with_official(self, template_manager, mock_official_templates):
+    def test_list_templates_with_official(self, all_templates):
         """Test listing templates includes official templates."""
-        # Mock official templates
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            templates = template_manager.list_templates(include_official=True)
-            
-            # Should have both custom and official templates
-            custom_templates = [t for t in templates if t["source"] == "custom"]
-            official_templates = [t for t in templates if t["source"] == "official"]
-            
-            assert len(custom_templates) > 0  # Has custom templates
-            assert len(official_templates) == 2  # Has mock official templates
-            assert len(templates) == len(custom_templates) + len(official_templates)
-            
-            # Check official template structure
-            official_text2img = next(t for t in official_templates if t["name"] == "official_text2img")
-            assert official_text2img["display_name"] == "Official Text2Img"
-            assert official_text2img["category"] == "Generation"
-            assert official_text2img["source"] == "official"
-            assert len(official_text2img["preview_images"]) == 1
-    
-    def test_list_templates_exclude_official(self, template_manager, mock_official_templates):
+        by_source, by_name = index_templates(all_templates)
+        
+        # Should have both custom and official templates
+        assert len(by_source["custom"]) > 0  # Has custom templates
+        assert len(by_source["official"]) == 2  # Has mock official templates
+        assert len(all_templates) == len(by_source["custom"]) + len(by_source["official"])
+        
+        # Check official template structure
+        official_text2img = by_name["official_text2img"]
+        assert official_text2img["display_name"] == "Official Text2Img"
+        assert official_text2img["category"] == "Generation"
+        assert official_text2img["source"] == "official"
+        assert len(official_text2img["preview_images"]) == 1
+    
+    def test_list_templates_exclude_official(self, template_manager, patched_official):
         """Test listing templates can exclude official templates."""
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            templates = template_manager.list_templates(include_official=False)
-            
-            # Should only have custom templates
-            sources = [t["source"] for t in templates]
-            assert all(source == "custom" for source in sources)
+        templates = template_manager.list_templates(include_official=False)
+        
+        # Should only have custom templates
+        sources = [t["source"] for t in templates]
+        assert all(source == "custom" for source in sources)
     
-    def test_search_templates_mixed_sources(self, template_manager, mock_official_templates):
+    def test_search_templates_mixed_sources(self, template_manager, patched_official):
         """Test searching across both custom and official templates."""
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # Search for text-related templates
-            results = template_manager.search_templates(query="text", include_official=True)
-            
-            # Should find both custom and official templates
-            sources = [r["source"] for r in results]
-            assert "custom" in sources
-            assert "official" in sources
-            
-            # Check specific results
-            template_names = [r["name"] for r in results]
-            assert "text2img_basic" in template_names  # Custom template
-            assert "official_text2img" in template_names  # Official template
+        # Search for text-related templates
+        results = template_manager.search_templates(query="text", include_official=True)
+        
+        # Should find both custom and official templates
+        sources = [r["source"] for r in results]
+        assert "custom" in sources
+        assert "official" in sources
+        
+        # Check specific results
+        template_names = [r["name"] for r in results]
+        assert "text2img_basic" in template_names  # Custom template
+        assert "official_text2img" in template_names  # Official template
     
-    def test_search_templates_by_source(self, template_manager, mock_official_templates):
+    def test_search_templates_by_source(self, template_manager, patched_official):
         """Test searching templates filtered by source."""
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # Search only custom templates
-            custom_results = template_manager.search_templates(source="custom", include_official=True)
-            assert all(r["source"] == "custom" for r in custom_results)
-            
-            # Search only official templates
-            official_results = template_manager.search_templates(source="official", include_official=True)
-            assert all(r["source"] == "official" for r in official_results)
-            assert len(official_results) == 2
+        # Search only custom templates
+        custom_results = template_manager.search_templates(source="custom", include_official=True)
+        assert all(r["source"] == "custom" for r in custom_results)
+        
+        # Search only official templates
+        official_results = template_manager.search_templates(source="official", include_official=True)
+        assert all(r["source"] == "official" for r in official_results)
+        assert len(official_results) == 2
     
-    def test_generate_workflow_from_official(self, template_manager, mock_official_templates):
+    def test_generate_workflow_from_official(self, template_manager, patched_official):
         """Test generating workflow from official template."""
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # Generate from official template with auto source
-            dsl_content = template_manager.generate_workflow(
-                "official_text2img",
-                parameters={"prompt": "test prompt"},
-                source="auto"
-            )
-            
-            assert dsl_content is not None
-            assert "test prompt" in dsl_content
-            assert "TestNode" in dsl_content
+        # Generate from official template with auto source
+        dsl_content = template_manager.generate_workflow(
+            "official_text2img",
+            parameters={"prompt": "test prompt"},
+            source="auto"
+        )
+        
+        assert dsl_content is not None
+        assert "test prompt" in dsl_content
+        assert "TestNode" in dsl_content
     
-    def test_generate_workflow_explicit_official_source(self, template_manager, mock_official_templates):
+    def test_generate_workflow_explicit_official_source(self, template_manager, patched_official):
         """Test generating workflow explicitly from official source."""
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # Generate explicitly from official source
-            dsl_content = template_manager.generate_workflow(
-                "official_img2img",
-                parameters={"strength": "0.8"},
-                source="official"
-            )
-            
-            assert dsl_content is not None
-            assert "strength: 0.8" in dsl_content
-            assert "EditNode" in dsl_content
+        # Generate explicitly from official source
+        dsl_content = template_manager.generate_workflow(
+            "official_img2img",
+            parameters={"strength": "0.8"},
+            source="official"
+        )
+        
+        assert dsl_content is not None
+        assert "strength: 0.8" in dsl_content
+        assert "EditNode" in dsl_content
     
-    def test_generate_workflow_source_priority(self, template_manager, mock_official_templates):
+    def test_generate_workflow_source_priority(self, template_manager, patched_official):
         """Test that custom templates take priority with auto source."""
         # Create a custom template with same name as official
         custom_name = "text2img_basic"  # This exists in custom templates
         
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # With auto source, should prefer custom template
-            dsl_content = template_manager.generate_workflow(custom_name, source="auto")
-            
-            # Should get custom template content (contains CheckpointLoaderSimple)
-            assert "CheckpointLoaderSimple" in dsl_content
+        # With auto source, should prefer custom template
+        dsl_content = template_manager.generate_workflow(custom_name, source="auto")
+        
+        # Should get custom template content (contains CheckpointLoaderSimple)
+        assert "CheckpointLoaderSimple" in dsl_content
     
-    def test_validate_parameters_official_template(self, template_manager, mock_official_templates):
+    def test_validate_parameters_official_template(self, template_manager, patched_official):
         """Test parameter validation for official templates."""
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # Valid parameters
-            validation = template_manager.validate_parameters(
-                "official_text2img", 
-                {"prompt": "test prompt"},
-                source="official"
-            )
-            
-            assert validation["valid"] is True
-            assert len(validation["errors"]) == 0
-            
-            # Missing required parameters  
-            validation = template_manager.validate_parameters(
-                "official_text2img",
-                {},  # No parameters provided
-                source="official"
-            )
-            
-            assert validation["valid"] is False
-            assert len(validation["errors"]) > 0
+        # Valid parameters
+        validation = template_manager.validate_parameters(
+            "official_text2img", 
+            {"prompt": "test prompt"},
+            source="official"
+        )
+        
+        assert validation["valid"] is True
+        assert len(validation["errors"]) == 0
+        
+        # Missing required parameters  
+        validation = template_manager.validate_parameters(
+            "official_text2img",
+            {},  # No parameters provided
+            source="official"
+        )
+        
+        assert validation["valid"] is False
+        assert len(validation["errors"]) > 0
     
-    @pytest.mark.asyncio
-    async def test_sync_official_templates_integration(self, template_manager):
+    async def test_sync_official_templates_integration(self, template_manager, monkeypatch):
         """Test syncing official templates through template manager."""
         # Mock the sync operation
         mock_result = {
@@ -166,62 +170,53 @@ class TestOfficialTemplateIntegration:
             "templates": ["template1", "template2", "template3", "template4", "template5"]
         }
         
-        with patch.object(template_manager, 'sync_official_templates', return_value=mock_result) as mock_sync:
-            result = await template_manager.sync_official_templates()
-            
-            assert result["status"] == "success"
-            assert result["synced_count"] == 5
-            assert len(result["templates"]) == 5
-            mock_sync.assert_called_once()
+        calls = []
+        
+        async def fake_sync(*args, **kwargs):
+            calls.append((args, kwargs))
+            return mock_result
+        
+        monkeypatch.setattr(template_manager, 'sync_official_templates', fake_sync)
+        result = await template_manager.sync_official_templates()
+        
+        assert result["status"] == "success"
+        assert result["synced_count"] == 5
+        assert len(result["templates"]) == 5
+        assert len(calls) == 1
     
-    def test_get_official_template_direct(self, template_manager, mock_official_templates):
+    def test_get_official_template_direct(self, template_manager, patched_official):
         """Test getting official template directly."""
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            template = template_manager.get_official_template("official_text2img")
-            
-            assert template is not None
-            assert template.name == "Official Text2Img"
-            assert template.category == "Generation"
-            
-            # Test non-existent template
-            template = template_manager.get_official_template("nonexistent")
-            assert template is None
+        template = template_manager.get_official_template("official_text2img")
+        
+        assert template is not None
+        assert template.name == "Official Text2Img"
+        assert template.category == "Generation"
+        
+        # Test non-existent template
+        template = template_manager.get_official_template("nonexistent")
+        assert template is None
 
 
 class TestTemplateManagerMixedSources:
     """Test template manager behavior with mixed template sources."""
     
-    @pytest.fixture  
-    def template_manager(self):
-        return TemplateManager()
-    
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_official_templates(self):
-        return {
-            "official_advanced": OfficialTemplate(
-                name="Advanced Official",
-                description="Advanced official workflow",
-                category="Advanced",
-                workflow_json={},
-                dsl_content="## Advanced\n\nadvanced_node: AdvancedNode"
-            )
-        }
+        return {"official_advanced": _ADVANCED}
     
-    def test_template_count_consistency(self, template_manager, mock_official_templates):
+    def test_template_count_consistency(self, all_templates, patched_official):
         """Test that template counts are consistent across operations."""
-        with patch.object(official_manager, 'templates', mock_official_templates):
-            # Get all templates
-            all_templates = template_manager.list_templates(include_official=True)
-            total_count = len(all_templates)
-            
-            # Count by source
-            custom_count = len([t for t in all_templates if t["source"] == "custom"])
-            official_count = len([t for t in all_templates if t["source"] == "official"])
-            
-            assert total_count == custom_count + official_count
-            assert official_count == len(mock_official_templates)
+        total_count = len(all_templates)
+        
+        # Count by source
+        by_source, _ = index_templates(all_templates)
+        custom_count = len(by_source["custom"])
+        official_count = len(by_source["official"])
+        
+        assert total_count == custom_count + official_count
+        assert official_count == len(patched_official)
     
-    def test_template_name_uniqueness_across_sources(self, template_manager, mock_official_templates):
+    def test_template_name_uniqueness_across_sources(self, template_manager, monkeypatch):
         """Test that templates can have same names across different sources."""
         # Create official template with same name as custom template
         mock_templates = {
@@ -234,38 +229,21 @@ class TestTemplateManagerMixedSources:
             )
         }
         
-        with patch.object(official_manager, 'templates', mock_templates):
-            # Should be able to generate from both sources
-            custom_dsl = template_manager.generate_workflow("text2img_basic", source="custom")
-            official_dsl = template_manager.generate_workflow("text2img_basic", source="official")
-            
-            # Should get different content
-            assert "CheckpointLoaderSimple" in custom_dsl  # Custom template content
-            assert "OfficialNode" in official_dsl  # Official template content
-            assert custom_dsl != official_dsl
-    
-    def test_search_performance_with_official_templates(self, template_manager, mock_official_templates):
-        """Test that search performance is reasonable with official templates."""
-        # Create more mock templates to test performance
-        large_mock_templates = {}
-        for i in range(50):
-            large_mock_templates[f"template_{i}"] = OfficialTemplate(
-                name=f"Template {i}",
-                description=f"Test template number {i}",
-                category="Test",
-                workflow_json={}
-            )
+        monkeypatch.setattr(official_manager, 'templates', mock_templates)
+        # Should be able to generate from both sources
+        custom_dsl = template_manager.generate_workflow("text2img_basic", source="custom")
+        official_dsl = template_manager.generate_workflow("text2img_basic", source="official")
+        
+        # Should get different content
+        assert "CheckpointLoaderSimple" in custom_dsl  # Custom template content
+        assert "OfficialNode" in official_dsl  # Official template content
+        assert custom_dsl != official_dsl
+    
+    def test_search_performance_with_official_templates(
+        self, template_manager, monkeypatch, benchmark, large_mock_templates
+    ):
+        """Benchmark search across custom and many official templates."""
+        monkeypatch.setattr(official_manager, 'templates', large_mock_templates)
+        results = benchmark(template_manager.search_templates, query="template", include_official=True)
         
-        with patch.object(official_manager, 'templates', large_mock_templates):
-            # Search should complete quickly
-            import time
-            start_time = time.time()
-            
-            results = template_manager.search_templates(query="template", include_official=True)
-            
-            end_time = time.time()
-            search_time = end_time - start_time
-            
-            # Should find results and complete quickly (under 1 second)
-            assert len(results) > 0
-            assert search_time < 1.0
\ No newline at end of file
+        assert len(results) > 0
@@ -1,67 +1,58 @@
 """Unit tests for DSL converters."""
 
+import re
 import pytest
+from collections import Counter
 from typing import Dict, Any
 
 from comfy_mcp.dsl import (
-    DSLParser, 
     DslToJsonConverter, 
     JsonToDslConverter,
+    Workflow,
     is_full_workflow_format,
     full_workflow_to_simplified
 )
 
 
+# Keep suites sharing the session template manager/parser on one xdist worker
+pytestmark = pytest.mark.xdist_group("template_manager")
+
+# First DSL line containing a connection reference
+_CONN_LINE_RE = re.compile(r"[^\n]*@[^\n]*")
+
+
+def find_node_by_type(workflow: Dict[str, Any], class_type: str) -> Dict[str, Any]:
+    """Return the first JSON node with the given class_type."""
+    return next(node for node in workflow.values() if node["class_type"] == class_type)
+
+
 class TestDslToJsonConverter:
     """Test DSL to JSON conversion."""
     
-    def test_convert_simple_workflow(
-        self, 
-        dsl_parser: DSLParser,
-        dsl_to_json_converter: DslToJsonConverter,
-        sample_dsl: str
-    ):
+    def test_convert_simple_workflow(self, sample_ast_json: Dict[str, Any]):
         """Test converting DSL to JSON."""
-        workflow_ast = dsl_parser.parse(sample_dsl)
-        json_workflow = dsl_to_json_converter.convert(workflow_ast)
+        json_workflow = sample_ast_json
         
         assert isinstance(json_workflow, dict)
         assert len(json_workflow) == 7  # 7 nodes in sample workflow
         
         # Check node types are preserved
-        node_types = [node["class_type"] for node in json_workflow.values()]
-        expected_types = [
-            "CheckpointLoaderSimple", "CLIPTextEncode", "CLIPTextEncode",
+        node_types = {node["class_type"] for node in json_workflow.values()}
+        expected_types = {
+            "CheckpointLoaderSimple", "CLIPTextEncode",
             "EmptyLatentImage", "KSampler", "VAEDecode", "SaveImage"
-        ]
-        assert all(t in node_types for t in expected_types)
+        }
+        assert expected_types.issubset(node_types)
     
     def test_convert_connections(
         self,
-        dsl_parser: DSLParser, 
-        dsl_to_json_converter: DslToJsonConverter
+        dsl_to_json_converter: DslToJsonConverter,
+        single_connection_workflow: Workflow
     ):
         """Test that connections are properly converted."""
-        dsl = '''## Test
-
-input_node: InputType
-  param: value
-
-output_node: OutputType
-  connection_param: @input_node.output
-'''
+        json_workflow = dsl_to_json_converter.convert(single_connection_workflow)
         
-        workflow_ast = dsl_parser.parse(dsl)
-        json_workflow = dsl_to_json_converter.convert(workflow_ast)
-        
-        # Find the output node
-        output_node = None
-        for node in json_workflow.values():
-            if node["class_type"] == "OutputType":
-                output_node = node
-                break
-        
-        assert output_node is not None
+        output_node = find_node_by_type(json_workflow, "OutputType")
         assert "connection_param" in output_node["inputs"]
         
         # Connection should be represented as [node_id, output_index]
@@ -71,23 +62,13 @@ output_node: OutputType
     
     def test_convert_property_types(
         self,
-        dsl_parser: DSLParser,
-        dsl_to_json_converter: DslToJsonConverter
+        dsl_to_json_converter: DslToJsonConverter,
+        typed_properties_workflow: Workflow
     ):
         """Test that different property types are converted correctly."""
-        dsl = '''## Test
-
-test_node: TestType
-  string_param: hello world
-  int_param: 42
-  float_param: 3.14
-  bool_param: true
-'''
+        json_workflow = dsl_to_json_converter.convert(typed_properties_workflow)
         
-        workflow_ast = dsl_parser.parse(dsl)
-        json_workflow = dsl_to_json_converter.convert(workflow_ast)
-        
-        node = list(json_workflow.values())[0]
+        node = next(iter(json_workflow.values()))
         inputs = node["inputs"]
         
         assert inputs["string_param"] == "hello world"
@@ -110,10 +91,9 @@ class TestJsonToDslConverter:
         # Convert to string to verify structure
         dsl_text = str(workflow_ast)
         
-        assert "CheckpointLoaderSimple" in dsl_text
-        assert "CLIPTextEncode" in dsl_text
-        assert "KSampler" in dsl_text
-        assert "SaveImage" in dsl_text
+        assert {"CheckpointLoaderSimple", "CLIPTextEncode", "KSampler", "SaveImage"}.issubset(
+            dsl_text.split()
+        )
         
         # Check that connections are converted to @ syntax
         assert "@" in dsl_text
@@ -140,68 +120,48 @@ class TestJsonToDslConverter:
         # Should contain connection syntax
         assert "@" in dsl_text
         # Verify the specific connection
-        lines = dsl_text.split('\n')
-        connection_line = next(line for line in lines if '@' in line)
+        connection_line = _CONN_LINE_RE.search(dsl_text).group(0)
         assert "input_param: @" in connection_line
 
 
 class TestRoundTripConversion:
     """Test round-trip conversion between DSL and JSON."""
     
-    def test_dsl_json_dsl_roundtrip(
+    @pytest.mark.parametrize("direction", ["dsl2json", "json2dsl"])
+    def test_roundtrip_preserves_node_types(
         self,
-        dsl_parser: DSLParser,
-        dsl_to_json_converter: DslToJsonConverter, 
-        json_to_dsl_converter: JsonToDslConverter,
-        sample_dsl: str
-    ):
-        """Test DSL -> JSON -> DSL round trip."""
-        # Parse original DSL
-        original_ast = dsl_parser.parse(sample_dsl)
-        
-        # Convert to JSON
-        json_workflow = dsl_to_json_converter.convert(original_ast)
-        
-        # Convert back to DSL
-        roundtrip_ast = json_to_dsl_converter.convert(json_workflow)
-        
-        # Note: Section grouping may differ as JSON->DSL converter groups by node type
-        # Focus on ensuring all nodes are preserved
-        
-        # Check that all original nodes are present
-        original_nodes = []
-        for section in original_ast.sections:
-            for node in section.nodes:
-                original_nodes.append(node.node_type)
-        
-        roundtrip_nodes = []
-        for section in roundtrip_ast.sections:
-            for node in section.nodes:
-                roundtrip_nodes.append(node.node_type)
-        
-        assert sorted(original_nodes) == sorted(roundtrip_nodes)
-    
-    def test_json_dsl_json_roundtrip(
-        self,
-        dsl_parser: DSLParser,
+        direction: str,
         dsl_to_json_converter: DslToJsonConverter,
-        json_to_dsl_converter: JsonToDslConverter, 
+        json_to_dsl_converter: JsonToDslConverter,
+        sample_ast: Workflow,
+        sample_ast_json: Dict[str, Any],
         sample_json: Dict[str, Any]
     ):
-        """Test JSON -> DSL -> JSON round trip."""
-        # Convert to DSL
-        dsl_ast = json_to_dsl_converter.convert(sample_json)
-        
-        # Convert back to JSON
-        roundtrip_json = dsl_to_json_converter.convert(dsl_ast)
-        
-        # Should have same number of nodes
-        assert len(sample_json) == len(roundtrip_json)
-        
-        # Check that all node types are preserved
-        original_types = [node["class_type"] for node in sample_json.values()]
-        roundtrip_types = [node["class_type"] for node in roundtrip_json.values()]
-        assert sorted(original_types) == sorted(roundtrip_types)
+        """Test DSL -> JSON -> DSL and JSON -> DSL -> JSON round trips."""
+        if direction == "dsl2json":
+            original_ast = sample_ast
+            roundtrip_ast = json_to_dsl_converter.convert(sample_ast_json)
+            
+            # Note: Section grouping may differ as JSON->DSL converter groups by node type
+            # Focus on ensuring all nodes are preserved
+            original_types = [
+                node.node_type for section in original_ast.sections for node in section.nodes
+            ]
+            roundtrip_types = [
+                node.node_type for section in roundtrip_ast.sections for node in section.nodes
+            ]
+        else:
+            roundtrip_json = dsl_to_json_converter.convert(
+                json_to_dsl_converter.convert(sample_json)
+            )
+            
+            # Should have same number of nodes
+            assert len(sample_json) == len(roundtrip_json)
+            
+            original_types = [node["class_type"] for node in sample_json.values()]
+            roundtrip_types = [node["class_type"] for node in roundtrip_json.values()]
+        
+        assert Counter(original_types) == Counter(roundtrip_types)
 
 
 class TestWorkflowFormatHelpers:
@@ -2,6 +2,11 @@
 
 import pytest
 from comfy_mcp.dsl import DSLParser, Workflow, Section, Node, Property, Connection
+from comfy_mcp.dsl import parser as parser_module
+
+
+# Keep suites sharing the session template manager/parser on one xdist worker
+pytestmark = pytest.mark.xdist_group("template_manager")
 
 
 class TestDSLParser:
@@ -21,20 +26,40 @@ class TestDSLParser:
         assert "Generation" in section_names
         assert "Output" in section_names
     
-    def test_parse_node_with_properties(self, dsl_parser: DSLParser):
-        """Test parsing a node with various property types."""
-        dsl = '''## Test
-
-node1: NodeType
-  text_prop: hello world
-  int_prop: 42
-  float_prop: 3.14
-  bool_prop: true
-  connection_prop: @other.output
-'''
+    def test_parse_records_counts(self, dsl_parser: DSLParser, sample_dsl: str):
+        """Test that parsed workflows carry node and section counts."""
+        workflow = dsl_parser.parse(sample_dsl)
+        
+        # The sample has 4 sections and 7 nodes
+        assert workflow.section_count == 4
+        assert workflow.node_count == 7
         
-        workflow = dsl_parser.parse(dsl)
-        section = workflow.sections[0]
+        # Counts follow edits to the parsed workflow
+        expected = workflow.node_count + 1
+        workflow.sections[0].nodes.append(workflow.sections[0].nodes[0].model_copy())
+        assert workflow.node_count == expected
+    
+    def test_parse_repeated_input_returns_independent_copies(self, dsl_parser: DSLParser, sample_dsl: str):
+        """Test that cached parses don't share mutable state."""
+        first = dsl_parser.parse(sample_dsl)
+        first.sections.pop()
+        second = dsl_parser.parse(sample_dsl)
+        
+        assert len(second.sections) == len(first.sections) + 1
+        assert second.node_count == len(second.list_nodes())
+    
+    def test_parse_cache_keys_on_digest(self, dsl_parser: DSLParser, sample_dsl: str):
+        """Test that the parse cache stores digests, not the DSL text."""
+        dsl_parser.parse(sample_dsl)
+        cache = parser_module._parse_cache
+        assert 0 < len(cache) <= parser_module._PARSE_CACHE_SIZE
+        for _, digest in cache:
+            assert isinstance(digest, bytes) and len(digest) == 16
+        assert all(sample_dsl not in key for key in cache)
+    
+    def test_parse_node_with_properties(self, properties_workflow: Workflow):
+        """Test parsing a node with various property types."""
+        section = properties_workflow.sections[0]
         node = section.nodes[0]
         
         assert node.name == "node1"
@@ -50,20 +75,9 @@ node1: NodeType
         assert props_by_name["connection_prop"].node == "other"
         assert props_by_name["connection_prop"].output == "output"
     
-    def test_parse_connections(self, dsl_parser: DSLParser):
+    def test_parse_connections(self, connections_workflow: Workflow):
         """Test parsing connections between nodes."""
-        dsl = '''## Test
-
-input_node: InputType
-  param: value
-
-output_node: OutputType
-  input_param: @input_node.output
-  another_input: @input_node.model
-'''
-        
-        workflow = dsl_parser.parse(dsl)
-        section = workflow.sections[0]
+        section = connections_workflow.sections[0]
         output_node = section.nodes[1]
         
         connections = [p for p in output_node.properties if isinstance(p.value, Connection)]
@@ -105,17 +119,9 @@ not a valid node definition
         assert len(workflow.sections) == len(workflow2.sections)
         assert workflow.sections[0].header == workflow2.sections[0].header
         
-    def test_node_string_representation(self, dsl_parser: DSLParser):
+    def test_node_string_representation(self, simple_node_workflow: Workflow):
         """Test node string representation."""
-        dsl = '''## Test
-
-test_node: TestType
-  param1: value1
-  param2: 42
-'''
-        
-        workflow = dsl_parser.parse(dsl)
-        node = workflow.sections[0].nodes[0]
+        node = simple_node_workflow.sections[0].nodes[0]
         node_str = str(node)
         
         assert "test_node: TestType" in node_str
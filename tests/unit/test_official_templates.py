@@ -3,8 +3,9 @@
 import pytest
 import asyncio
 import json
+import dataclasses
 from unittest.mock import AsyncMock, patch, MagicMock
-from comfy_mcp.templates.official import OfficialTemplateManager, OfficialTemplate
+from comfy_mcp.templates.official import OfficialTemplateManager, OfficialTemplate, RateLimitedError
 
 
 class TestOfficialTemplateManager:
@@ -65,59 +66,75 @@ class TestOfficialTemplateManager:
             ]
         }
     
-    @pytest.mark.asyncio
-    async def test_fetch_template_list(self, manager):
+    @pytest.fixture
+    def mock_session(self):
+        """A stand-in aiohttp session whose get() yields ``mock_session.response``."""
+        session = MagicMock()
+        session.response = MagicMock()
+        session.get.return_value.__aenter__.return_value = session.response
+        return session
+    
+    async def test_fetch_template_list(self, manager, mock_session):
         """Test fetching template list from GitHub API."""
-        with patch('aiohttp.ClientSession') as mock_session:
-            mock_response = AsyncMock()
-            mock_response.status = 200
-            mock_response.json = AsyncMock(return_value=[{"name": "test.json"}])
-            
-            mock_session.return_value.__aenter__ = AsyncMock(return_value=mock_session.return_value)
-            mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
-            mock_session.return_value.get.return_value.__aenter__ = AsyncMock(return_value=mock_response)
-            mock_session.return_value.get.return_value.__aexit__ = AsyncMock(return_value=None)
-            
-            result = await manager.fetch_template_list()
-            
-            assert result == [{"name": "test.json"}]
-            mock_session.return_value.get.assert_called_once_with(
-                f"{manager.GITHUB_API_BASE}/{manager.TEMPLATES_PATH}"
-            )
+        mock_session.response.status = 200
+        mock_session.response.json = AsyncMock(return_value=[{"name": "test.json"}])
+        
+        result = await manager.fetch_template_list(session=mock_session)
+        
+        assert result == [{"name": "test.json"}]
+        mock_session.get.assert_called_once_with(
+            f"{manager.GITHUB_API_BASE}/{manager.TEMPLATES_PATH}"
+        )
     
-    @pytest.mark.asyncio
-    async def test_fetch_template_list_error(self, manager):
+    async def test_fetch_template_list_error(self, manager, mock_session):
         """Test error handling when GitHub API fails."""
-        with patch('aiohttp.ClientSession') as mock_session:
-            mock_response = AsyncMock()
-            mock_response.status = 404
-            
-            mock_session.return_value.__aenter__ = AsyncMock(return_value=mock_session.return_value)
-            mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
-            mock_session.return_value.get.return_value.__aenter__ = AsyncMock(return_value=mock_response)
-            mock_session.return_value.get.return_value.__aexit__ = AsyncMock(return_value=None)
-            
-            with pytest.raises(Exception, match="Failed to fetch templates: 404"):
-                await manager.fetch_template_list()
+        mock_session.response.status = 404
+        
+        with pytest.raises(Exception, match="Failed to fetch templates: 404"):
+            await manager.fetch_template_list(session=mock_session)
     
-    @pytest.mark.asyncio
-    async def test_download_workflow_json(self, manager, sample_workflow_json):
+    async def test_download_workflow_json(self, manager, mock_session, sample_workflow_json):
         """Test downloading workflow JSON file."""
-        with patch('aiohttp.ClientSession') as mock_session:
-            mock_response = AsyncMock()
-            mock_response.status = 200
-            mock_response.text = AsyncMock(return_value=json.dumps(sample_workflow_json))
-            
-            mock_session.return_value.__aenter__ = AsyncMock(return_value=mock_session.return_value)
-            mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
-            mock_session.return_value.get.return_value.__aenter__ = AsyncMock(return_value=mock_response)
-            mock_session.return_value.get.return_value.__aexit__ = AsyncMock(return_value=None)
-            
+        mock_session.response.status = 200
+        mock_session.response.read = AsyncMock(return_value=json.dumps(sample_workflow_json).encode())
+        
+        result = await manager.download_workflow_json(
+            "https://test.com/workflow.json", session=mock_session
+        )
+        
+        assert result == sample_workflow_json
+    
+    async def test_download_opens_session_when_none_given(self, manager, mock_session):
+        """Test that a short-lived session is opened and closed when the caller has none."""
+        mock_session.response.status = 200
+        mock_session.response.read = AsyncMock(return_value=b"{}")
+        scope = MagicMock()
+        scope.__aenter__.return_value = mock_session
+        
+        with patch.object(manager, '_new_session', return_value=scope):
             result = await manager.download_workflow_json("https://test.com/workflow.json")
-            
-            assert result == sample_workflow_json
+        
+        assert result == {}
+        mock_session.get.assert_called_once_with("https://test.com/workflow.json")
+        scope.__aexit__.assert_awaited_once()
+    
+    async def test_sync_closes_its_session(self, manager, sample_template_list, sample_workflow_json):
+        """Test that sync shares one session across requests and closes it afterwards."""
+        scope = MagicMock()
+        fetch = AsyncMock(return_value=sample_template_list)
+        download = AsyncMock(return_value=sample_workflow_json)
+        
+        with patch.object(manager, '_new_session', return_value=scope), \
+             patch.object(manager, 'fetch_template_list', fetch), \
+             patch.object(manager, 'download_workflow_json', download), \
+             patch.object(manager, '_cache_templates', return_value=None):
+            await manager.sync_official_templates()
+        
+        session = scope.__aenter__.return_value
+        assert fetch.await_args.kwargs["session"] is session
+        assert all(call.kwargs["session"] is session for call in download.await_args_list)
+        scope.__aexit__.assert_awaited_once()
     
-    @pytest.mark.asyncio
     async def test_sync_official_templates(self, manager, sample_template_list, sample_workflow_json):
         """Test syncing official templates."""
         # Mock the API calls
@@ -143,7 +160,6 @@ class TestOfficialTemplateManager:
                 assert template.dsl_content is not None
                 assert len(template.preview_images) == 1  # Should find the .webp file
     
-    @pytest.mark.asyncio
     async def test_sync_handles_conversion_errors(self, manager, sample_template_list, sample_workflow_json):
         """Test sync handles DSL conversion errors gracefully."""
         with patch.object(manager, 'fetch_template_list', return_value=sample_template_list), \
@@ -161,7 +177,37 @@ class TestOfficialTemplateManager:
                 for template in result.values():
                     assert template.dsl_content is None
     
-    @pytest.mark.asyncio  
+    async def test_download_retries_after_rate_limit(self, manager, sample_workflow_json):
+        """Test that 403/429 responses wait for Retry-After before retrying."""
+        download = AsyncMock(side_effect=[
+            RateLimitedError("Failed to download workflow: 429", retry_after=7),
+            sample_workflow_json
+        ])
+        
+        with patch.object(manager, 'download_workflow_json', download), \
+             patch('asyncio.sleep', new=AsyncMock()) as mock_sleep:
+            result = await manager._download_template(
+                {"name": "limited.json", "download_url": "https://test.com/limited.json"}
+            )
+        
+        assert result == sample_workflow_json
+        mock_sleep.assert_awaited_once_with(7)
+    
+    async def test_download_caps_large_retry_after(self, manager, sample_workflow_json):
+        """Test that an excessive Retry-After falls back to exponential backoff."""
+        download = AsyncMock(side_effect=[
+            RateLimitedError("Failed to download workflow: 429", retry_after=3600),
+            sample_workflow_json
+        ])
+        
+        with patch.object(manager, 'download_workflow_json', download), \
+             patch('asyncio.sleep', new=AsyncMock()) as mock_sleep:
+            await manager._download_template(
+                {"name": "limited.json", "download_url": "https://test.com/limited.json"}
+            )
+        
+        mock_sleep.assert_awaited_once_with(manager.config.retry_delay)
+    
     async def test_cache_templates(self, manager, tmp_path):
         """Test template caching functionality."""
         # Set cache directory to temp path
@@ -182,15 +228,55 @@ class TestOfficialTemplateManager:
         cache_file = tmp_path / "official_templates.json"
         assert cache_file.exists()
         
-        # Load and verify cache content
+        assert not (tmp_path / "official_templates.json.tmp").exists()
+        
+        # Load and verify cache content: a header line, then one record per template
         with open(cache_file, 'r') as f:
-            cache_data = json.load(f)
+            header, *records = [json.loads(line) for line in f]
         
-        assert "templates" in cache_data
-        assert "test" in cache_data["templates"]
-        assert cache_data["templates"]["test"]["name"] == "Test Template"
+        assert header["format"] == "ndjson"
+        assert header["metadata"]["template_count"] == 1
+        assert len(records) == 1
+        assert records[0]["key"] == "test"
+        assert records[0]["template"]["name"] == "Test Template"
+        
+        # And it round-trips through the loader
+        result = await manager._load_cached_templates()
+        assert result["test"] == templates["test"]
+    
+    async def test_cache_templates_with_int_keys(self, manager, tmp_path):
+        """Test caching a workflow whose JSON uses integer keys."""
+        manager.cache_dir = tmp_path
+        templates = {
+            "int_keys": OfficialTemplate(
+                name="Int Keys",
+                description="Integer node ids",
+                category="Test",
+                workflow_json={1: {"class_type": "KSampler", "inputs": {}}}
+            )
+        }
+        
+        await manager._cache_templates(templates)
+        
+        # Keys come back as strings, as with json.dump
+        result = await manager._load_cached_templates()
+        assert result["int_keys"].workflow_json == {"1": {"class_type": "KSampler", "inputs": {}}}
+    
+    async def test_cache_write_failure_keeps_previous_cache(self, manager, tmp_path):
+        """Test that a failed write leaves the old cache and no temp file behind."""
+        manager.cache_dir = tmp_path
+        manager.config = dataclasses.replace(manager.config, backup_cache=True)
+        cache_file = tmp_path / "official_templates.json"
+        cache_file.write_text("previous cache")
+        
+        with patch('comfy_mcp.templates.official._json_line', side_effect=TypeError("boom")):
+            with pytest.raises(TypeError):
+                await manager._cache_templates({})
+        
+        assert cache_file.read_text() == "previous cache"
+        assert not (tmp_path / "official_templates.json.tmp").exists()
+        assert not list(tmp_path.glob("official_templates_backup_*"))
     
-    @pytest.mark.asyncio
     async def test_load_cached_templates(self, manager, tmp_path):
         """Test loading templates from cache."""
         # Set cache directory to temp path
@@ -288,6 +374,38 @@ class TestOfficialTemplateManager:
         assert result[0]["has_dsl"] is True
         assert result[1]["has_dsl"] is False
     
+    def test_list_templates_tracks_template_changes(self, manager):
+        """Test that the cached listing is rebuilt when templates change."""
+        manager.templates = {
+            "first": OfficialTemplate(name="First", description="", category="A", workflow_json={})
+        }
+        assert [t["name"] for t in manager.list_templates()] == ["first"]
+        
+        manager.templates["second"] = OfficialTemplate(
+            name="Second", description="", category="B", workflow_json={}
+        )
+        assert [t["name"] for t in manager.list_templates()] == ["first", "second"]
+        
+        # Listings are copies of the cache
+        listing = manager.list_templates()
+        listing[0]["preview_images"].append("mutated.webp")
+        assert manager.list_templates()[0]["preview_images"] == []
+        
+        manager.templates = {}
+        assert manager.list_templates() == []
+    
+    def test_list_templates_after_in_place_overwrite(self, manager):
+        """Test that the cached listing is dropped when a template is overwritten."""
+        manager.templates = {
+            "a": OfficialTemplate(name="A", description="old", category="X", workflow_json={})
+        }
+        assert manager.list_templates()[0]["description"] == "old"
+        
+        manager.templates["a"] = OfficialTemplate(
+            name="A", description="new", category="X", workflow_json={}
+        )
+        assert manager.list_templates()[0]["description"] == "new"
+    
     def test_search_templates(self, manager):
         """Test searching templates."""
         # Add templates to manager
@@ -321,6 +439,34 @@ class TestOfficialTemplateManager:
         result = manager.search_templates(query="generate", category="generation")
         assert len(result) == 1
         assert result[0]["name"] == "text_gen"
+    
+    def test_search_templates_after_in_place_overwrite(self, manager):
+        """Test that the category index follows templates overwritten in place."""
+        manager.templates = {
+            "a": OfficialTemplate(name="A", description="", category="Old", workflow_json={})
+        }
+        assert [t["name"] for t in manager.search_templates(category="old")] == ["a"]
+        
+        manager.templates["a"] = OfficialTemplate(
+            name="A", description="", category="New", workflow_json={}
+        )
+        assert manager.search_templates(category="old") == []
+        assert [t["name"] for t in manager.search_templates(category="new")] == ["a"]
+        assert manager.list_templates()[0]["category"] == "New"
+    
+    def test_search_templates_after_in_place_replace(self, manager):
+        """Test that query search sees templates swapped in place."""
+        manager.templates = {
+            "a": OfficialTemplate(name="A", description="", category="X", workflow_json={})
+        }
+        assert manager.search_templates(query="a")[0]["name"] == "a"
+        
+        manager.templates.pop("a")
+        manager.templates["b"] = OfficialTemplate(
+            name="B", description="Upscaler", category="X", workflow_json={}
+        )
+        assert [t["name"] for t in manager.search_templates(query="b")] == ["b"]
+        assert [t["name"] for t in manager.search_templates(query="upscal")] == ["b"]
 
 
 class TestOfficialTemplate:
@@ -344,7 +490,7 @@ class TestOfficialTemplate:
         assert template.category == "Testing"
         assert template.workflow_json == {"nodes": []}
         assert template.dsl_content == "test dsl"
-        assert template.preview_images == ["image1.webp"]
+        assert template.preview_images == ("image1.webp",)
         assert template.source_url == "https://github.com/test"
         assert template.last_updated == "2024-01-01"
     
@@ -358,6 +504,18 @@ class TestOfficialTemplate:
         )
         
         assert template.dsl_content is None
-        assert template.preview_images is None
+        assert template.preview_images == ()
         assert template.source_url == ""
-        assert template.last_updated == ""
\ No newline at end of file
+        assert template.last_updated == ""
+    
+    def test_template_is_frozen(self):
+        """Test that templates are immutable once created."""
+        template = OfficialTemplate(
+            name="Frozen Template",
+            description="Immutable",
+            category="Test",
+            workflow_json={}
+        )
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            template.name = "Changed"
\ No newline at end of file
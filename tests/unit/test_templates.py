@@ -2,16 +2,12 @@
 
 import pytest
 from comfy_mcp.templates import TemplateManager, TEMPLATES
+from comfy_mcp.templates.templates import render_dsl
 
 
 class TestTemplateManager:
     """Test template manager functionality."""
     
-    @pytest.fixture
-    def template_manager(self):
-        """Create template manager for testing."""
-        return TemplateManager()
-    
     def test_list_templates(self, template_manager: TemplateManager):
         """Test listing all templates."""
         templates = template_manager.list_templates()
@@ -25,6 +21,17 @@ class TestTemplateManager:
         for key in required_keys:
             assert key in template
     
+    def test_list_templates_returns_copies(self, template_manager: TemplateManager):
+        """Test that mutating a listing doesn't leak into later listings."""
+        first = template_manager.list_templates(include_official=False)
+        first[0]["extra"] = True
+        first[0]["tags"].append("mutated")
+        
+        second = template_manager.list_templates(include_official=False)
+        assert "extra" not in second[0]
+        assert "mutated" not in second[0]["tags"]
+        assert "mutated" not in template_manager.get_template(second[0]["name"]).tags
+    
     def test_get_template(self, template_manager: TemplateManager):
         """Test getting specific template."""
         template_info = template_manager.get_template_info("text2img_basic")
@@ -234,4 +241,12 @@ class TestTemplateDefinitions:
         """Test that all templates have tags."""
         for template in TEMPLATES.values():
             assert isinstance(template.tags, list)
-            assert len(template.tags) > 0
\ No newline at end of file
+            assert len(template.tags) > 0
+    
+    def test_render_dsl_substitutes_parameters(self):
+        """Test that pre-tokenized rendering substitutes known placeholders only."""
+        dsl_content = render_dsl("text2img_basic", {"prompt": "a red fox"})
+        
+        assert "text: a red fox" in dsl_content
+        assert "{prompt}" not in dsl_content
+        assert "{width}" in dsl_content  # Missing parameters are left in place